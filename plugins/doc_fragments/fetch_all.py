@@ -0,0 +1,22 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r"""
+options:
+  fetch_all:
+    description:
+      - Walks every page of the endpoint and returns all the items instead of a single page.
+      - The items are returned under the same key a single page response has them.
+      - The page size and the starting point are taken from the pagination arguments when they are given.
+    required: false
+    type: bool
+    default: false
+"""
@@ -0,0 +1,28 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+
+class ModuleDocFragment(object):
+    DOCUMENTATION = r"""
+options:
+  use_cache:
+    description:
+      - Serves the response from an on-disk cache shared by every host and fork of the controller.
+      - The response is requested from Tenable only when it is not cached yet or its cache entry expired.
+      - The cache can also be enabled for every module with the C(TENABLE_RESPONSE_CACHE) environment variable.
+    required: false
+    type: bool
+    default: false
+  cache_ttl:
+    description:
+      - Seconds a cached response is valid for.
+      - When not given, filters are kept for one hour and templates, timezones and credential types for one day.
+    required: false
+    type: int
+"""
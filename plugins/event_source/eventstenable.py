@@ -21,6 +21,75 @@ Arguments:
                        variable TENABLE_SECRET_KEY. Required.
     interval: The interval in minutes at which the API should be queried.
               Default is 5 minutes.
+    endpoints: List of endpoints polled concurrently by the same source, instead of endpoint.
+               Each entry has an endpoint and optionally its own data_key and interval, which
+               default to the data_key and interval arguments. Events of these endpoints carry
+               the endpoint they come from in tenable_endpoint.
+    max_concurrency: Maximum number of requests in flight at the same time. Default is 10.
+    dedup: Emits only the items that are new or changed since the previous polls, instead of
+           every item on every poll. Their events carry tenable_event set to new or changed.
+           Default is false.
+    identity_field: Field identifying an item across polls, dotted for nested fields like
+                    "asset.uuid". Items without it are identified by their content. Can also be
+                    set per endpoints entry. Default is "id".
+    ignore_fields: Top level fields left out of the content compared between polls, like
+                   timestamps that change on every poll. Default is none.
+    emit_resolved: With dedup, emits an event with tenable_event set to resolved, holding the last
+                   seen item, when an item is no longer returned. Default is false.
+    state_path: SQLite file keeping the items seen and the watermarks, so a restarted source does
+                not emit them again. It is created readable by its owner only. Default is
+                tenable-eda-state.sqlite in tenable-<uid> of the temporary directory, private to the user.
+    state_max_items: Maximum number of items kept in the state, the least recently seen are
+                     forgotten first. Default is 100000.
+    source_name: Name keeping the items seen and the watermarks of this source apart from other
+                 sources sharing state_path that poll the same endpoints with the same account and
+                 settings. Default is none.
+    watermark_param: Query parameter set to the time of the previous successful poll, like "since"
+                     or "last_found", so each poll only returns what changed in between. The first
+                     poll is a full one. The time is kept in state_path so a restarted source
+                     resumes where it stopped. Can also be set per endpoints entry. Default is none.
+    watermark_format: Format of the watermark, epoch for unix seconds or iso8601. Default is epoch.
+    watermark_overlap: Seconds the watermark is moved back so items indexed late by Tenable are
+                       not missed, they may be emitted twice. Default is 60.
+    max_backoff: After a failed poll the interval is doubled on each consecutive failure, up to
+                 max_backoff minutes, and goes back to normal once a poll succeeds. Default is 60.
+    jitter: Fraction of the interval every wait is randomly moved by, so sources started together
+            do not keep hitting the API at the same time. Default is 0.1.
+    adaptive_interval: Halves the interval after a poll that emitted events, down to min_interval,
+                       and doubles it after a quiet one, up to max_interval. Meant to be used with
+                       dedup or watermark_param, so quiet polls emit nothing. Default is false.
+    min_interval: Shortest interval in minutes with adaptive_interval. Default is a quarter of the
+                  interval.
+    max_interval: Longest interval in minutes with adaptive_interval. Default is four times the
+                  interval.
+    pagination: Walks the pages of endpoints that paginate, offset to send offset and limit, page to
+                send page (starting at 1) and size. Each page is put on the queue as it arrives.
+                Can also be set per endpoints entry. Default is none, only the first page is read.
+    page_size: Items requested per page with pagination. Default is 1000.
+    max_pages: Maximum number of pages requested per poll with pagination. A poll stopped by it is
+               not complete, so dedup does not report resolved items and the watermark is not
+               moved. Default is 100.
+    batch_size: Groups up to batch_size items of a page into a single event, whose tenable holds the
+                list of items, instead of emitting one event per item. Items with a different
+                tenable_event or tenable_endpoint go to different events. Default is 1, no batching.
+    queue_size: Number of events the rulebook queue can hold before the source considers the
+                rulebook behind and keeps up to queue_size more events in its own buffer, handled
+                by backpressure. The dedup state and the watermark only move once the events of a
+                poll have left the buffer, so buffered events lost on a restart are emitted again.
+                Default is 1000.
+    backpressure: What happens when the buffer of the source is full. block waits for the rulebook
+                  to take events, pausing the polls. drop_oldest drops the oldest buffered event, it
+                  is never emitted again even with dedup. coalesce replaces the buffered event of the
+                  same item, by identity_field, with its newer one and waits for room otherwise.
+                  Default is block.
+    metrics_file: JSON file rewritten after every poll with, for each endpoint, the current interval
+                  in seconds, the consecutive failures, the polls and events so far and the events
+                  emitted to the rulebook, dropped and coalesced by backpressure. Default is none.
+
+Requests run on a bounded thread pool through AsyncTenableAPI so the ansible-rulebook
+event loop is never blocked while waiting for Tenable, and each endpoint is polled by its own task. Connections to the Tenable API
+are kept alive and reused between polls, the pool can be tuned with the
+TENABLE_POOL_SIZE and TENABLE_POOL_IDLE_TIMEOUT (seconds) environment variables.
 
 Example:
 -------
@@ -57,17 +126,97 @@ Example:
         endpoint: "scanners/null/agent-groups"
         data_key: "groups"
         interval: 30
+
+    # polls critical vulnerabilities every minute and agents every hour in the same source
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoints:
+          - endpoint: "workbenches/vulnerabilities?filter.0.filter=severity&filter.0.quality=eq&filter.0.value=Critical"
+            data_key: "vulnerabilities"
+            interval: 1
+          - endpoint: "scanners/null/agents"
+            data_key: "agents"
+            interval: 60
+        max_concurrency: 4
+
+    # emits critical vulnerabilities once, again when they change and when they are fixed
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoint: "workbenches/vulnerabilities?filter.0.filter=severity&filter.0.quality=eq&filter.0.value=Critical"
+        data_key: "vulnerabilities"
+        interval: 5
+        dedup: true
+        identity_field: "plugin_id"
+        ignore_fields:
+          - "vulnerability_state"
+        emit_resolved: true
+        state_path: "/var/lib/eda/tenable-critical.sqlite"
+
+    # only asks for the vulnerabilities found since the previous poll
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoint: "workbenches/vulnerabilities"
+        data_key: "vulnerabilities"
+        interval: 10
+        watermark_param: "since"
+        state_path: "/var/lib/eda/tenable-vulnerabilities.sqlite"
+
+    # polls every minute while there are changes, slowing down to every 30 minutes when quiet
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoint: "scanners/null/agents"
+        data_key: "agents"
+        interval: 5
+        dedup: true
+        adaptive_interval: true
+        min_interval: 1
+        max_interval: 30
+        metrics_file: "/var/lib/eda/tenable-metrics.json"
+
+    # walks every page of the agents, 5000 at a time
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoint: "scanners/null/agents"
+        data_key: "agents"
+        pagination: "offset"
+        page_size: 5000
+        max_pages: 20
+
+    # emits the vulnerabilities in events of 500, keeping only the newest one of an item buffered
+    - valkiriaaquatica.tenable.eventstenable:
+        endpoint: "workbenches/vulnerabilities"
+        data_key: "vulnerabilities"
+        dedup: true
+        identity_field: "plugin_id"
+        batch_size: 500
+        queue_size: 200
+        backpressure: "coalesce"
 """
 
 import asyncio
+import base64
+import functools
+import hashlib
+import http.client
 import json
 import os
+import random
+import socket
+import sqlite3
+import ssl
+import stat
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from types import MappingProxyType
 from typing import Any
 from typing import Dict
 from urllib.error import HTTPError
 from urllib.error import URLError
-
-from ansible.module_utils.urls import Request
+from urllib.parse import unquote
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+from urllib.request import proxy_bypass
 
 
 class AuthenticationError(Exception):
@@ -95,34 +244,164 @@ def get_tenable_credentials(access_key=None, secret_key=None):
     return access_key, secret_key
 
 
+class PooledResponse:
+    """Response that gives its keep-alive connection back to the pool once fully read."""
+
+    def __init__(self, pool, key, conn, response):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.headers = response.headers
+        self.status = response.status
+
+    def getcode(self):
+        return self.status
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        if self._response.isclosed():
+            self._release()
+        return data
+
+    def close(self):
+        if self._conn is None:
+            return
+        if self._response.isclosed():
+            self._release()
+        else:
+            # unread data is left on the socket, it can not be reused
+            self._response.close()
+            self._conn.close()
+            self._conn = None
+
+    def _release(self):
+        if self._conn is None:
+            return
+        if self._response.will_close:
+            self._conn.close()
+        else:
+            self._pool.release(self._key, self._conn)
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConnectionPool:
+    """Keep-alive connections reused across polls, mirrors module_utils/transport.py."""
+
+    def __init__(self, pool_size=None, idle_timeout=None, timeout=30):
+        self.pool_size = pool_size or int(os.getenv("TENABLE_POOL_SIZE", 10))
+        self.idle_timeout = idle_timeout or float(os.getenv("TENABLE_POOL_IDLE_TIMEOUT", 60))
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._ssl_context = ssl.create_default_context()
+
+    def _new_connection(self, scheme, host, port):
+        proxy = getproxies().get(scheme)
+        if proxy and not proxy_bypass(host):
+            parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            conn_host, conn_port = parts.hostname, parts.port or 8080
+        else:
+            proxy = None
+            conn_host, conn_port = host, port
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(conn_host, conn_port, timeout=self.timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(conn_host, conn_port, timeout=self.timeout)
+        if proxy:
+            tunnel_headers = {}
+            if parts.username:
+                credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+                tunnel_headers["Proxy-Authorization"] = f"Basic {base64.b64encode(credentials).decode('ascii')}"
+            conn.set_tunnel(host, port, headers=tunnel_headers)
+        return conn
+
+    def _get_connection(self, key):
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return conn, True
+                conn.close()
+        return self._new_connection(*key), False
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def open(self, method, url, headers=None, data=None):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        while True:
+            conn, reused = self._get_connection(key)
+            try:
+                conn.request(method, path, body=data, headers=headers or {})
+                response = conn.getresponse()
+                break
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                # the server closed an idle connection, retry once on a fresh one
+                conn.close()
+                if not reused:
+                    raise URLError(e)
+            except (TimeoutError, socket.timeout) as e:
+                conn.close()
+                raise TimeoutError(str(e))
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                raise URLError(e)
+
+        pooled = PooledResponse(self, key, conn, response)
+        if response.status >= 400:
+            raise HTTPError(url, response.status, response.reason, response.headers, pooled)
+        return pooled
+
+
 class TenableAPI:
-    def __init__(self, access_key=None, secret_key=None):
+    def __init__(self, access_key=None, secret_key=None, pool_size=None, idle_timeout=None):
         self.access_key, self.secret_key = get_tenable_credentials(access_key, secret_key)
         self.base_url = "https://cloud.tenable.com"
-        self.headers = {
-            "Accept": "application/json",
-            "X-ApiKeys": f"accessKey={self.access_key};secretKey={self.secret_key}",
-        }
-        self.client = Request(validate_certs=True, timeout=30)
+        # read-only defaults, merged with the headers of each call
+        self.headers = MappingProxyType(
+            {
+                "Accept": "application/json",
+                "X-ApiKeys": f"accessKey={self.access_key};secretKey={self.secret_key}",
+            }
+        )
+        self.client = ConnectionPool(pool_size=pool_size, idle_timeout=idle_timeout)
 
-    def request(self, method: str, endpoint: str, data: dict = None) -> dict:
+    def request(self, method: str, endpoint: str, data: dict = None, headers: dict = None) -> dict:
         url = f"{self.base_url}/{endpoint}"
 
+        headers = {**self.headers, **(headers or {})}
         if data:
             data = json.dumps(data).encode("utf-8")
             if method in ["PATCH", "POST", "PUT"]:
-                self.headers["Content-Type"] = "application/json"
-        else:
-            self.headers.pop("Content-Type", None)
+                headers["Content-Type"] = "application/json"
 
         try:
-            response = self.client.open(method=method, url=url, headers=self.headers, data=data)
-            response_body = response.read()
+            with self.client.open(method=method, url=url, headers=headers, data=data) as response:
+                response_body = response.read()
             if response_body:
                 return json.loads(response_body.decode("utf-8"))
             return {}
         except HTTPError as e:
-            error_data = e.read().decode("utf-8")
+            try:
+                error_data = e.read().decode("utf-8")
+            finally:
+                e.close()
             if e.code == 400:
                 raise BadRequestError(error_data, e.code)
             elif e.code == 401:
@@ -135,6 +414,30 @@ class TenableAPI:
             raise TenableAPIError(f"Request timed out: {str(e)}", None)
 
 
+class AsyncTenableAPI:
+    """asyncio client running TenableAPI calls on a bounded thread pool, mirrors module_utils/api.py.
+
+    At most max_concurrency calls are in flight and cancelling a call releases its slot at once.
+    """
+
+    def __init__(self, api=None, max_concurrency=10, **kwargs):
+        self.api = api or TenableAPI(**kwargs)
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = None
+
+    async def request(self, method: str, endpoint: str, data: dict = None, headers: dict = None) -> dict:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            call = functools.partial(self.api.request, method=method, endpoint=endpoint, data=data, headers=headers)
+            return await loop.run_in_executor(self._executor, call)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
 def get_nested_value(d, keys):
     """Recursively get a value from a nested dictionary just when nested is in json response"""
     for key in keys:
@@ -145,43 +448,632 @@ def get_nested_value(d, keys):
     return d
 
 
-async def main(queue: asyncio.Queue, args: Dict[str, Any]):
-    valid_keys = {"endpoint", "data_key", "tenable_access_key", "tenable_secret_key", "interval"}
+def get_state_path(path: str = None) -> str:
+    """Returns the state file, by default in a directory of the temporary directory private to the user."""
+    if path:
+        return path
+    directory = os.path.join(tempfile.gettempdir(), f"tenable-{os.getuid()}")
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f"{directory} is not a private directory of the current user.")
+    return os.path.join(directory, "tenable-eda-state.sqlite")
 
-    for key in args:
-        if key not in valid_keys:
-            raise ValueError(f"Invalid argument '{key}' provided.")
 
-    endpoint = args.get("endpoint")
-    data_key = args.get("data_key", "data")
-    access_key = args.get("tenable_access_key")
-    secret_key = args.get("tenable_secret_key")
-    interval_minutes = args.get("interval", 5)
-    interval_seconds = interval_minutes * 60
+def connect_state(path: str):
+    """Opens the SQLite state file, created readable by its owner only, links are not followed."""
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600))
+    return sqlite3.connect(path, timeout=30)
 
-    if not endpoint:
-        raise ValueError("Endpoint must be provided, It cannot be empty.")
 
-    tenable_api = TenableAPI(access_key=access_key, secret_key=secret_key)
+class DedupState:
+    """Items seen by the previous polls of each source, kept in SQLite and bounded to max_items.
 
-    while True:
+    Each item is stored with a hash of its content so only new and changed items are emitted. Items
+    are kept per account, source_name, endpoint, identity_field and ignore_fields, so sources polling
+    another account or comparing the same endpoint differently do not see each other's items.
+    """
+
+    def __init__(self, path=None, max_items=100000, ignore_fields=None, access_key=None, source_name=None):
+        self.path = get_state_path(path)
+        self.max_items = max_items
+        self.ignore_fields = set(ignore_fields or [])
+        self.access_key = access_key
+        self.source_name = source_name
+        self._lock = threading.Lock()
+        conn = connect_state(self.path)
         try:
-            response = tenable_api.request(method="GET", endpoint=endpoint)
-            keys = data_key.split(".")
-            data_to_process = get_nested_value(response, keys)
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS items "
+                    "(source TEXT, identity TEXT, hash TEXT, item TEXT, seen REAL, PRIMARY KEY (source, identity))"
+                )
+        finally:
+            conn.close()
+
+    def content_hash(self, item) -> str:
+        if isinstance(item, dict) and self.ignore_fields:
+            item = {key: value for key, value in item.items() if key not in self.ignore_fields}
+        return hashlib.sha256(json.dumps(item, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def get_source(self, endpoint: str, identity_field: str) -> str:
+        settings = json.dumps([self.access_key, self.source_name, identity_field, sorted(self.ignore_fields)])
+        return f"{endpoint} {hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]}"
+
+    def update(self, endpoint: str, items: list, identity_field: str):
+        """Compares the items of a page with the stored ones, returning the (tenable_event, item) pairs to emit.
+
+        The items are only stored by calling the returned commit function, once their events have been
+        emitted, so events lost before that are emitted again by the next poll. Once a poll has stored
+        all its pages, resolve returns the items it did not see.
+        """
+        source = self.get_source(endpoint, identity_field)
+        keys = identity_field.split(".")
+        current = {}
+        for item in items:
+            content_hash = self.content_hash(item)
+            identity = get_nested_value(item, keys) if isinstance(item, dict) else None
+            identity = content_hash if identity is None else json.dumps(identity, default=str)
+            current[identity] = (content_hash, item)
+
+        changes = []
+        with self._lock:
+            conn = connect_state(self.path)
+            try:
+                for identity, (content_hash, item) in current.items():
+                    row = conn.execute(
+                        "SELECT hash FROM items WHERE source = ? AND identity = ?", (source, identity)
+                    ).fetchone()
+                    if row is None:
+                        changes.append(("new", item))
+                    elif row[0] != content_hash:
+                        changes.append(("changed", item))
+            finally:
+                conn.close()
+
+        rows = [
+            (source, identity, content_hash, json.dumps(item, default=str))
+            for identity, (content_hash, item) in current.items()
+        ]
+        return changes, functools.partial(self._store, rows)
+
+    def _store(self, rows: list):
+        now = time.time()
+        with self._lock:
+            conn = connect_state(self.path)
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO items (source, identity, hash, item, seen) VALUES (?, ?, ?, ?, ?)",
+                        [row + (now,) for row in rows],
+                    )
+                    overflow = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] - self.max_items
+                    if overflow > 0:
+                        conn.execute(
+                            "DELETE FROM items WHERE rowid IN (SELECT rowid FROM items ORDER BY seen LIMIT ?)",
+                            (overflow,),
+                        )
+            finally:
+                conn.close()
+
+    def resolve(self, endpoint: str, identity_field: str, started: float):
+        """Returns the items of the source not stored since started as resolved, with the commit function forgetting them."""
+        source = self.get_source(endpoint, identity_field)
+        with self._lock:
+            conn = connect_state(self.path)
+            try:
+                rows = conn.execute(
+                    "SELECT identity, item FROM items WHERE source = ? AND seen < ?", (source, started)
+                ).fetchall()
+            finally:
+                conn.close()
+        changes = [("resolved", json.loads(item)) for unused_identity, item in rows]
+        return changes, functools.partial(self._forget, source, [identity for identity, unused_item in rows])
+
+    def _forget(self, source: str, identities: list):
+        with self._lock:
+            conn = connect_state(self.path)
+            try:
+                with conn:
+                    conn.executemany(
+                        "DELETE FROM items WHERE source = ? AND identity = ?",
+                        [(source, identity) for identity in identities],
+                    )
+            finally:
+                conn.close()
 
-            if data_to_process:
-                for item in data_to_process:
-                    await queue.put({"tenable": item})
+
+class WatermarkState:
+    """Time of the last successful poll of each source, kept in SQLite to resume after a restart.
+
+    Watermarks are kept per account, source_name, endpoint and watermark_param, so sources polling
+    another account or filtering the same endpoint by another parameter do not move each other's.
+    """
+
+    def __init__(self, path=None, access_key=None, source_name=None):
+        self.path = get_state_path(path)
+        self.access_key = access_key
+        self.source_name = source_name
+        conn = connect_state(self.path)
+        try:
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS watermarks (source TEXT PRIMARY KEY, watermark REAL)")
+        finally:
+            conn.close()
+
+    def get_source(self, endpoint: str, watermark_param: str) -> str:
+        settings = json.dumps([self.access_key, self.source_name, watermark_param])
+        return f"{endpoint} {hashlib.sha256(settings.encode('utf-8')).hexdigest()[:16]}"
+
+    def get(self, endpoint: str, watermark_param: str):
+        source = self.get_source(endpoint, watermark_param)
+        conn = connect_state(self.path)
+        try:
+            row = conn.execute("SELECT watermark FROM watermarks WHERE source = ?", (source,)).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+    def set(self, endpoint: str, watermark_param: str, watermark: float):
+        source = self.get_source(endpoint, watermark_param)
+        conn = connect_state(self.path)
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO watermarks (source, watermark) VALUES (?, ?)", (source, watermark))
+        finally:
+            conn.close()
+
+
+def add_query(endpoint: str, params: Dict[str, Any]) -> str:
+    """Returns the endpoint with the params added to its query."""
+    separator = "&" if urlsplit(endpoint).query else "?"
+    return f"{endpoint}{separator}{urlencode(params)}"
+
+
+def add_watermark(endpoint: str, param: str, watermark: float, watermark_format: str = "epoch") -> str:
+    """Returns the endpoint with the watermark added to its query."""
+    if watermark_format == "iso8601":
+        value = datetime.fromtimestamp(watermark, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    else:
+        value = int(watermark)
+    return add_query(endpoint, {param: value})
+
+
+async def iter_pages(tenable_api: AsyncTenableAPI, endpoint: str, poller: Dict[str, Any]):
+    """Yields the response, its items under data_key and whether it is the last page, for each page of the endpoint.
+
+    Pages are walked with offset and limit or page and size, as set by pagination, and at most max_pages
+    are requested per poll. Walking stops at a short or empty page or once the total in the pagination
+    of the response is reached.
+    """
+    keys = poller["data_key"].split(".")
+    pagination = poller["pagination"]
+    page_size = poller["page_size"]
+    fetched = 0
+    for page in range(poller["max_pages"] if pagination else 1):
+        if pagination == "offset":
+            page_endpoint = add_query(endpoint, {"offset": fetched, "limit": page_size})
+        elif pagination == "page":
+            page_endpoint = add_query(endpoint, {"page": page + 1, "size": page_size})
+        else:
+            page_endpoint = endpoint
+        response = await tenable_api.request(method="GET", endpoint=page_endpoint)
+        items = get_nested_value(response, keys)
+
+        fetched += len(items or [])
+        total = get_nested_value(response, ["pagination", "total"])
+        last = (
+            not pagination
+            or not isinstance(items, list)
+            or len(items) < page_size
+            or (isinstance(total, int) and fetched >= total)
+        )
+        yield response, items, last
+        if last:
+            return
+
+
+class PollSchedule:
+    """Seconds to wait between the polls of an endpoint, with backoff on failures, jitter and adaptive intervals."""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        max_backoff_seconds: float = 3600,
+        jitter: float = 0.1,
+        adaptive: bool = False,
+        min_interval_seconds: float = None,
+        max_interval_seconds: float = None,
+    ):
+        self.interval_seconds = interval_seconds
+        self.max_backoff_seconds = max(max_backoff_seconds, interval_seconds)
+        self.jitter = jitter
+        self.adaptive = adaptive
+        self.min_interval_seconds = interval_seconds / 4 if min_interval_seconds is None else min_interval_seconds
+        self.max_interval_seconds = interval_seconds * 4 if max_interval_seconds is None else max_interval_seconds
+        self.failures = 0
+
+    def succeeded(self, changed: bool):
+        self.failures = 0
+        if self.adaptive:
+            if changed:
+                self.interval_seconds = max(self.interval_seconds / 2, self.min_interval_seconds)
             else:
-                await queue.put({"tenable": response})
+                self.interval_seconds = min(self.interval_seconds * 2, self.max_interval_seconds)
+
+    def failed(self):
+        self.failures += 1
+
+    @property
+    def current_seconds(self) -> float:
+        if self.failures:
+            return min(self.interval_seconds * 2 ** min(self.failures, 32), self.max_backoff_seconds)
+        return self.interval_seconds
+
+    def next_delay(self) -> float:
+        return self.current_seconds * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def write_metrics(path: str, metrics: Dict[str, Any]):
+    """Replaces the metrics file at once so readers never see it half written."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w") as metrics_file:
+        json.dump(metrics, metrics_file)
+    os.replace(temp_path, path)
+
+
+def batch_events(events: list, batch_size: int) -> list:
+    """Groups consecutive events with the same keys besides tenable into events holding up to batch_size items."""
+    batches = []
+    for event in events:
+        meta = {key: value for key, value in event.items() if key != "tenable"}
+        if batches and len(batches[-1]["tenable"]) < batch_size and batches[-1]["meta"] == meta:
+            batches[-1]["tenable"].append(event["tenable"])
+        else:
+            batches.append({"tenable": [event["tenable"]], "meta": meta})
+    return [dict(tenable=batch["tenable"], **batch["meta"]) for batch in batches]
+
+
+class EventEmitter:
+    """Puts the events of every poller on the rulebook queue, buffering them while the rulebook is behind.
+
+    The rulebook is behind once its queue holds queue_size events, events are then kept in a buffer of
+    queue_size events, forwarded in order by run as the rulebook catches up. When the buffer is full,
+    the backpressure policy blocks the pollers, drops the oldest event or coalesces the events of the
+    same item. Every event is counted as emitted, dropped or coalesced in the counters it was put with,
+    and flush waits until none of the events put with some counters is left in the buffer.
+    """
+
+    def __init__(self, queue: asyncio.Queue, queue_size: int = 1000, policy: str = "block"):
+        self.queue = queue
+        self.queue_size = queue_size
+        self.policy = policy
+        self._pending = OrderedDict()
+        self._buffered = {}
+        self._sequence = 0
+        self._condition = asyncio.Condition()
 
-            await asyncio.sleep(interval_seconds)
+    def _track(self, counters: Dict[str, Any], count: int):
+        owner = id(counters)
+        self._buffered[owner] = self._buffered.get(owner, 0) + count
+        if not self._buffered[owner]:
+            del self._buffered[owner]
 
+    def _behind(self) -> bool:
+        return self.queue.full() or self.queue.qsize() >= self.queue_size
+
+    async def put(self, event: Dict[str, Any], counters: Dict[str, Any], key=None):
+        """Emits the event, key identifies the item it holds so a newer event of the same item can coalesce it."""
+        async with self._condition:
+            while True:
+                if self.policy == "coalesce" and key is not None and key in self._pending:
+                    self._track(self._pending[key][1], -1)
+                    self._track(counters, 1)
+                    self._pending[key] = (event, counters)
+                    counters["coalesced"] += 1
+                    self._condition.notify_all()
+                    return
+                if not self._pending and not self._behind():
+                    await self.queue.put(event)
+                    counters["emitted"] += 1
+                    return
+                if len(self._pending) < self.queue_size:
+                    if key is None or self.policy != "coalesce":
+                        self._sequence += 1
+                        key = self._sequence
+                    self._pending[key] = (event, counters)
+                    self._track(counters, 1)
+                    self._condition.notify_all()
+                    return
+                if self.policy == "drop_oldest":
+                    unused_key, (unused_event, dropped_counters) = self._pending.popitem(last=False)
+                    self._track(dropped_counters, -1)
+                    dropped_counters["dropped"] += 1
+                    self._condition.notify_all()
+                else:
+                    await self._condition.wait()
+
+    async def run(self):
+        """Forwards the buffered events to the rulebook queue as it has room for them."""
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: self._pending)
+                if not self._behind():
+                    unused_key, (event, counters) = self._pending.popitem(last=False)
+                    await self.queue.put(event)
+                    self._track(counters, -1)
+                    counters["emitted"] += 1
+                    self._condition.notify_all()
+                    continue
+            # the rulebook queue can not be waited on, it is checked again shortly
+            await asyncio.sleep(0.1)
+
+    async def flush(self, counters: Dict[str, Any]):
+        """Waits until every event put with the counters has left the buffer."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: id(counters) not in self._buffered)
+
+
+async def poll_endpoint(
+    tenable_api: AsyncTenableAPI,
+    emitter: EventEmitter,
+    poller: Dict[str, Any],
+    tag_endpoint: bool = False,
+    dedup_state: DedupState = None,
+    emit_resolved: bool = False,
+    watermark_state: WatermarkState = None,
+    metrics: Dict[str, Any] = None,
+    metrics_file: str = None,
+):
+    """Polls a single endpoint forever, emitting its items as scheduled by its PollSchedule."""
+    endpoint = poller["endpoint"]
+    watermark_param = poller["watermark_param"] if watermark_state is not None else None
+    schedule = poller["schedule"]
+    identity_keys = poller["identity_field"].split(".")
+    endpoint_metrics = {
+        "interval_seconds": schedule.current_seconds,
+        "failures": 0,
+        "polls": 0,
+        "events": 0,
+        "emitted": 0,
+        "dropped": 0,
+        "coalesced": 0,
+    }
+    if metrics is not None:
+        metrics[endpoint] = endpoint_metrics
+    loop = asyncio.get_running_loop()
+
+    async def emit(events: list) -> int:
+        for event in events:
+            if tag_endpoint:
+                event["tenable_endpoint"] = endpoint
+        if poller["batch_size"] > 1:
+            events = batch_events(events, poller["batch_size"])
+        for event in events:
+            identity = None
+            if isinstance(event["tenable"], dict):
+                identity = get_nested_value(event["tenable"], identity_keys)
+            key = None if identity is None else (endpoint, json.dumps(identity, default=str))
+            await emitter.put(event, endpoint_metrics, key)
+        return len(events)
+
+    while True:
+        endpoint_metrics["polls"] += 1
+        try:
+            # the states are kept on disk, they are read and written off the event loop
+            started = time.time()
+            watermark = None
+            if watermark_param:
+                watermark = await loop.run_in_executor(None, watermark_state.get, endpoint, watermark_param)
+
+            request_endpoint = endpoint
+            if watermark is not None:
+                request_endpoint = add_watermark(
+                    endpoint, watermark_param, watermark - poller["watermark_overlap"], poller["watermark_format"]
+                )
+
+            # pages are put on the queue as they arrive, the poll is never held in memory at once
+            emitted = 0
+            first = True
+            last = False
+            async for response, data_to_process, last in iter_pages(tenable_api, request_endpoint, poller):
+                if dedup_state is not None:
+                    items = [response] if data_to_process is None else data_to_process
+                    update = functools.partial(dedup_state.update, endpoint, items, poller["identity_field"])
+                    changes, commit = await loop.run_in_executor(None, update)
+                    emitted += await emit([{"tenable": item, "tenable_event": change} for change, item in changes])
+                    # the state only records items whose events left the buffer for the rulebook queue
+                    await emitter.flush(endpoint_metrics)
+                    await loop.run_in_executor(None, commit)
+
+                    # only a poll that walked every page, without a watermark, tells what disappeared
+                    if last and watermark is None:
+                        resolve = functools.partial(dedup_state.resolve, endpoint, poller["identity_field"], started)
+                        resolved, forget = await loop.run_in_executor(None, resolve)
+                        if emit_resolved:
+                            emitted += await emit(
+                                [{"tenable": item, "tenable_event": change} for change, item in resolved]
+                            )
+                            await emitter.flush(endpoint_metrics)
+                        await loop.run_in_executor(None, forget)
+                elif data_to_process:
+                    emitted += await emit([{"tenable": item} for item in data_to_process])
+                elif first:
+                    emitted += await emit([{"tenable": response}])
+                first = False
+            endpoint_metrics["events"] += emitted
+            if not last:
+                print(f"Tenable plugin polling {endpoint} stopped after max_pages {poller['max_pages']} pages.")
+
+            # only moved forward once every event of the poll is on the rulebook queue
+            if watermark_param and last:
+                await emitter.flush(endpoint_metrics)
+                await loop.run_in_executor(None, watermark_state.set, endpoint, watermark_param, started)
+            schedule.succeeded(bool(emitted))
         except asyncio.CancelledError:
-            break
+            raise
         except Exception as e:
-            print(f"Error in Tenable plugin: {e}")
+            schedule.failed()
+            print(f"Error in Tenable plugin polling {endpoint}, retrying in {schedule.current_seconds:.0f}s: {e}")
+
+        endpoint_metrics["interval_seconds"] = schedule.current_seconds
+        endpoint_metrics["failures"] = schedule.failures
+        if metrics_file:
+            try:
+                await loop.run_in_executor(None, write_metrics, metrics_file, dict(metrics))
+            except OSError as e:
+                print(f"Error writing Tenable plugin metrics to {metrics_file}: {e}")
+        await asyncio.sleep(schedule.next_delay())
+
+
+def get_pollers(args: Dict[str, Any]) -> list:
+    """Returns the endpoint, data_key, schedule, identity and watermark settings of every endpoint to poll."""
+    data_key = args.get("data_key", "data")
+    interval_minutes = args.get("interval", 5)
+    identity_field = args.get("identity_field", "id")
+    watermark_param = args.get("watermark_param")
+    watermark_format = args.get("watermark_format", "epoch")
+    pagination = args.get("pagination")
+    min_interval = args.get("min_interval")
+    max_interval = args.get("max_interval")
+    if watermark_format not in ("epoch", "iso8601"):
+        raise ValueError(f"Invalid watermark_format '{watermark_format}', it must be epoch or iso8601.")
+
+    if args.get("endpoints"):
+        entries = args["endpoints"]
+    elif args.get("endpoint"):
+        entries = [{"endpoint": args["endpoint"]}]
+    else:
+        raise ValueError("Endpoint must be provided, It cannot be empty.")
+
+    pollers = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("endpoint"):
+            raise ValueError(f"Every endpoints entry must have an endpoint: {entry}")
+        for key in entry:
+            if key not in ("endpoint", "data_key", "interval", "identity_field", "watermark_param", "pagination"):
+                raise ValueError(f"Invalid argument '{key}' provided in endpoints.")
+        if entry.get("pagination", pagination) not in (None, "offset", "page"):
+            raise ValueError(f"Invalid pagination '{entry.get('pagination', pagination)}', it must be offset or page.")
+        pollers.append(
+            {
+                "endpoint": entry["endpoint"],
+                "data_key": entry.get("data_key", data_key),
+                "schedule": PollSchedule(
+                    entry.get("interval", interval_minutes) * 60,
+                    max_backoff_seconds=args.get("max_backoff", 60) * 60,
+                    jitter=args.get("jitter", 0.1),
+                    adaptive=args.get("adaptive_interval", False),
+                    min_interval_seconds=None if min_interval is None else min_interval * 60,
+                    max_interval_seconds=None if max_interval is None else max_interval * 60,
+                ),
+                "identity_field": entry.get("identity_field", identity_field),
+                "watermark_param": entry.get("watermark_param", watermark_param),
+                "watermark_format": watermark_format,
+                "watermark_overlap": args.get("watermark_overlap", 60),
+                "pagination": entry.get("pagination", pagination),
+                "page_size": args.get("page_size", 1000),
+                "max_pages": args.get("max_pages", 100),
+                "batch_size": args.get("batch_size", 1),
+            }
+        )
+    return pollers
+
+
+async def main(queue: asyncio.Queue, args: Dict[str, Any]):
+    valid_keys = {
+        "endpoint",
+        "endpoints",
+        "data_key",
+        "tenable_access_key",
+        "tenable_secret_key",
+        "interval",
+        "max_concurrency",
+        "dedup",
+        "identity_field",
+        "ignore_fields",
+        "emit_resolved",
+        "state_path",
+        "state_max_items",
+        "source_name",
+        "watermark_param",
+        "watermark_format",
+        "watermark_overlap",
+        "max_backoff",
+        "jitter",
+        "adaptive_interval",
+        "min_interval",
+        "max_interval",
+        "metrics_file",
+        "pagination",
+        "page_size",
+        "max_pages",
+        "batch_size",
+        "queue_size",
+        "backpressure",
+    }
+
+    for key in args:
+        if key not in valid_keys:
+            raise ValueError(f"Invalid argument '{key}' provided.")
+
+    pollers = get_pollers(args)
+    backpressure = args.get("backpressure", "block")
+    if backpressure not in ("block", "drop_oldest", "coalesce"):
+        raise ValueError(f"Invalid backpressure '{backpressure}', it must be block, drop_oldest or coalesce.")
+    access_key = args.get("tenable_access_key")
+    secret_key = args.get("tenable_secret_key")
+    max_concurrency = args.get("max_concurrency", 10)
+
+    tenable_api = AsyncTenableAPI(access_key=access_key, secret_key=secret_key, max_concurrency=max_concurrency)
+    dedup_state = None
+    if args.get("dedup"):
+        dedup_state = DedupState(
+            path=args.get("state_path"),
+            max_items=args.get("state_max_items", 100000),
+            ignore_fields=args.get("ignore_fields"),
+            access_key=tenable_api.api.access_key,
+            source_name=args.get("source_name"),
+        )
+
+    watermark_state = None
+    if any(poller["watermark_param"] for poller in pollers):
+        watermark_state = WatermarkState(
+            path=args.get("state_path"), access_key=tenable_api.api.access_key, source_name=args.get("source_name")
+        )
+
+    tag_endpoint = bool(args.get("endpoints"))
+    emit_resolved = args.get("emit_resolved", False)
+    metrics = {}
+    emitter = EventEmitter(queue, queue_size=args.get("queue_size", 1000), policy=backpressure)
+    tasks = [asyncio.create_task(emitter.run())]
+    tasks += [
+        asyncio.create_task(
+            poll_endpoint(
+                tenable_api,
+                emitter,
+                poller,
+                tag_endpoint,
+                dedup_state,
+                emit_resolved,
+                watermark_state,
+                metrics,
+                args.get("metrics_file"),
+            )
+        )
+        for poller in pollers
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        tenable_api.close()
 
 
 if __name__ == "__main__":
@@ -16,10 +16,52 @@ description:
     - Filters can be applied, group formation, compose creation and all inventory default carachteristics Ansible offers.
     - A preffix and a suffix can be added to the host name creation.
     - If full_info argument is set to true, the inventory will take a bit longer because more data is being fetched.
+    - With asset_source set to export, assets are read with the Tenable asset export API instead of the workbench,
+      which is not capped and is processed chunk by chunk, suited for very large inventories.
+    - The cached assets are keyed by the account and the query they were fetched with, so changing the filters
+      never serves the assets of a previous query and inventory sources running the same query share them.
     - To use it, Tenable requires BASIC [16] user permissions.
     - Check more info on listing assets in the list_assets
       module or in https://developer.tenable.com/reference/workbenches-assets
+    - With source set to agents or networks, the hosts are the agents or the networks of the account instead.
 options:
+    source:
+        description:
+            - What the hosts of the inventory are.
+            - V(assets) reads the assets, from the source set in O(asset_source).
+            - V(agents) reads the agents from scanners/null/agents, each agent is added to a group per agent group
+              it belongs to, named with O(agent_group_prefix).
+            - V(networks) reads the networks.
+            - Agents and networks are read page by page, up to O(page_concurrency) pages at a time, and each page
+              is added to the inventory as it arrives.
+            - Agents and networks are named after their C(name). Without one, O(hostname_sources) and then
+              their C(uuid) are used.
+            - O(full_info) and the asset filters only apply to V(assets).
+        required: False
+        type: str
+        choices: ['assets', 'agents', 'networks']
+        default: assets
+    agent_group_prefix:
+        description:
+            - Prefix of the groups created for the agent groups with O(source=agents).
+        required: False
+        type: str
+        default: agent_group_
+    page_concurrency:
+        description:
+            - Number of pages of agents or networks downloaded at the same time.
+            - At most this number of pages, plus the one being added to the inventory, are held in memory.
+        required: False
+        type: int
+        default: 4
+    stats_file:
+        description:
+            - File a JSON line with the stats of each parse is appended to, to track the inventory over time.
+            - The stats are the wall time of each phase of the parse, the requests sent, retries and bytes received,
+              the inventory and asset details cache hits and misses, and the hosts and groups created.
+            - The same stats are always displayed with C(-vv).
+        required: False
+        type: path
     hostname_sources:
         description: List of fields to consider for the host name, in order of priority.
         required: False
@@ -47,6 +89,69 @@ options:
         type: list
         elements: dict
         default: []
+    asset_source:
+        description:
+            - API the assets are read from.
+            - V(workbench) reads them in a single call to workbenches/assets, filtered with O(include_filters),
+              O(filter_search_type), O(all_fields) and O(date_range).
+            - V(export) uses the asset export workflow, assets are streamed into the inventory chunk by chunk
+              so memory stays bounded for hundreds of thousands of assets. Filter them with O(export_filters).
+            - Exported assets already hold the full information so O(full_info) is ignored. Their list fields
+              are also exposed with the workbench names, for example C(hostnames) as C(hostname) and
+              C(operating_systems) as C(operating_system), so O(hostname_sources), groups and compose keep working.
+            - The asset export requires ADMINISTRATOR [64] user permissions.
+            - Check https://developer.tenable.com/reference/exports-assets-request-export for more info.
+        required: False
+        type: str
+        choices: ['workbench', 'export']
+        default: workbench
+    export_filters:
+        description:
+            - Filters of the asset export, sent as is, for example C(updated_at) or C(tag.<category>).
+            - Only used with O(asset_source=export).
+        required: False
+        type: dict
+        default: {}
+    incremental:
+        description:
+            - With O(asset_source=export) and O(cache) enabled, the exported assets are cached together with the
+              time they were synced at.
+            - Following runs export only the assets updated or deleted since that time and merge them into the
+              cached ones, instead of exporting every asset again.
+            - The first run, and any run after the cached assets expired, exports every asset, so set a long
+              O(cache_timeout).
+        required: False
+        type: bool
+        default: False
+    export_chunk_size:
+        description:
+            - Assets in each chunk of the export, between 100 and 10000.
+            - Only used with O(asset_source=export).
+        required: False
+        type: int
+        default: 1000
+    export_concurrency:
+        description:
+            - Number of export chunks downloaded at the same time.
+            - At most this number of chunks, plus the one being added to the inventory, are held in memory.
+            - Only used with O(asset_source=export).
+        required: False
+        type: int
+        default: 4
+    export_poll_interval:
+        description:
+            - Seconds to wait between checks of the export status while no new chunk is available.
+            - Only used with O(asset_source=export).
+        required: False
+        type: int
+        default: 5
+    export_timeout:
+        description:
+            - Seconds to wait for the export to finish before failing.
+            - Only used with O(asset_source=export).
+        required: False
+        type: int
+        default: 3600
     full_info:
         description:
             - Include full information for each asset.
@@ -56,6 +161,82 @@ options:
         required: False
         type: bool
         default: False
+    full_info_concurrency:
+        description:
+            - Number of asset details fetched at the same time when O(full_info=true).
+            - Hosts are still added in the order of the assets, each one as soon as its details arrive.
+            - Calls share the rate limit of the API key when C(TENABLE_RATE_LIMIT) is set.
+        required: False
+        type: int
+        default: 10
+    asset_details_cache:
+        description:
+            - Caches the details fetched with O(full_info) per asset, keyed by the asset id and its C(updated_at),
+              or C(last_seen), time so the details of unchanged assets are not fetched again on following runs.
+            - This cache is kept apart from the inventory cache, in a SQLite file with its own time to live and
+              size limit, shared by every inventory source using the same API key.
+        required: False
+        type: bool
+        default: False
+    asset_details_cache_ttl:
+        description: Seconds the cached details of an asset are valid for.
+        required: False
+        type: int
+        default: 86400
+    asset_details_cache_dir:
+        description:
+            - Directory of the asset details cache.
+            - Defaults to the C(TENABLE_CACHE_DIR) environment variable or a directory of the temporary directory
+              private to the user.
+        required: False
+        type: path
+    asset_details_cache_max_size:
+        description: Bytes the asset details cache can grow to before the least recently used details are evicted.
+        required: False
+        type: int
+        default: 268435456
+    tag_groups:
+        description:
+            - Adds each host to a group per value of the given tag categories, without templating.
+            - A much faster alternative to O(keyed_groups) over the tags for large inventories, Jinja is still
+              available through O(keyed_groups) and O(groups) for complex expressions.
+            - Each entry has the tag C(category) and optionally a C(prefix), a C(separator) (V(_) by default) and a
+              C(parent_group), with the same meaning they have in O(keyed_groups).
+            - Tags are read from the whole asset, before O(hostvars_fields) and O(exclude_fields) are applied.
+              The asset only has its tags with O(full_info), O(all_fields=full) or O(asset_source=export).
+        required: False
+        type: list
+        elements: dict
+        default: []
+    field_groups:
+        description:
+            - Adds each host to a group per value of the given top level asset fields, without templating.
+            - List fields add the host to a group per element, empty values are skipped.
+            - Each entry has the C(field) and optionally a C(prefix), a C(separator) (V(_) by default) and a
+              C(parent_group), with the same meaning they have in O(keyed_groups).
+            - Fields are read from the whole asset, before O(hostvars_fields) and O(exclude_fields) are applied.
+        required: False
+        type: list
+        elements: dict
+        default: []
+    hostvars_fields:
+        description:
+            - Top level asset fields kept in the C(asset_details) host variable, all of them when empty.
+            - Fields are projected before the host enters the inventory, so O(compose), O(groups) and
+              O(keyed_groups) only see the kept fields. The host name is picked from the whole asset.
+            - Keeping only the needed fields reduces the memory of the controller and the variables sent to every fork.
+        required: False
+        type: list
+        elements: str
+        default: []
+    exclude_fields:
+        description:
+            - Top level asset fields dropped from the C(asset_details) host variable.
+            - Applied after O(hostvars_fields), with the same effect on O(compose), O(groups) and O(keyed_groups).
+        required: False
+        type: list
+        elements: str
+        default: []
     all_fields:
         description:
         - Specifies whether to include all fields ('full') or only the default fields ('default') in the returned data.
@@ -170,6 +351,7 @@ compose:
 # make groups with their system type
 plugin: tenable
 full_info: true
+full_info_concurrency: 20
 groups:
   unavailable_tag: tags[0].tag_value == "Unavailable"
   stpped_aws_machines: aws_ec2_instance_state_name[0] == "stopped"
@@ -180,19 +362,226 @@ keyed_groups:
   - key: network_id
     prefix: "_"
   - key: system_type
+
+---
+
+# group hosts by tag values and fields without Jinja, for example aws_AWS, env_production and os_Linux
+# hosts are also added to a parent group per tag category
+plugin: tenable
+all_fields: full
+tag_groups:
+  - category: Cloud Provider
+    prefix: cloud
+    parent_group: cloud_providers
+  - category: Environment
+    prefix: env
+field_groups:
+  - field: operating_system
+    prefix: os
+  - field: has_agent
+    prefix: agent
+
+---
+
+# every agent as a host named after the agent, in a group per agent group like agent_group_linux_servers
+# and in a group per platform
+plugin: tenable
+source: agents
+hostname_sources:
+  - name
+page_concurrency: 8
+field_groups:
+  - field: platform
+    prefix: platform
+compose:
+  ansible_host: ip
+
+---
+
+# keep only the fields used by the playbooks and groups in the host variables
+plugin: tenable
+all_fields: full
+hostvars_fields:
+  - id
+  - ipv4
+  - fqdn
+  - operating_system
+keyed_groups:
+  - key: operating_system
+    prefix: 'os'
+
+---
+
+# only fetch the details of the assets updated since the last run
+plugin: tenable
+full_info: true
+asset_details_cache: true
+asset_details_cache_ttl: 604800
+
+---
+
+# read every asset updated since 2024-01-01 with the export API, 5000 assets per chunk
+# downloading 8 chunks at a time
+plugin: tenable
+asset_source: export
+export_chunk_size: 5000
+export_concurrency: 8
+export_filters:
+  updated_at: 1704067200
+keyed_groups:
+  - key: operating_system
+    prefix: 'os'
+
+---
+
+# keep the exported assets cached for a week and only export the changes on each run
+plugin: tenable
+asset_source: export
+incremental: true
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /tmp/tenable_inventory
+cache_timeout: 604800
 """
 
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import get_nested_value
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import get_pagination
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import init_tenable_api
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.exceptions import TenableAPIError
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.parameter_actions import add_custom_filters
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.parameter_actions import build_query_parameters
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.parameter_actions import handle_multiple_filters
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import ResponseCache
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import canonical_hash
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import get_response_cache
 
+from ansible.errors import AnsibleError
+from ansible.errors import AnsibleParserError
 from ansible.inventory.group import to_safe_group_name as orig_safe
 from ansible.plugins.inventory import BaseInventoryPlugin
 from ansible.plugins.inventory import Cacheable
 from ansible.plugins.inventory import Constructable
 from ansible.utils.vars import combine_vars
 
+# endpoints of the sources read page by page
+SOURCE_ENDPOINTS = {"agents": "scanners/null/agents", "networks": "networks"}
+
+# fields naming the hosts of each source, tried before and after the hostname_sources
+SOURCE_HOSTNAME_FIELDS = {"assets": ([], []), "agents": (["name"], ["uuid"]), "networks": (["name"], ["uuid"])}
+
+# list fields of exported assets and the names the workbench gives them
+EXPORT_FIELD_ALIASES = {
+    "hostname": "hostnames",
+    "fqdn": "fqdns",
+    "agent_name": "agent_names",
+    "ipv4": "ipv4s",
+    "ipv6": "ipv6s",
+    "mac_address": "mac_addresses",
+    "netbios_name": "netbios_names",
+    "operating_system": "operating_systems",
+}
+
+
+class InventoryStats:
+    """Wall time of the phases of a parse and counters of what it did.
+
+    The time of a phase nested in another one is only added to the nested phase, so the times of
+    all the phases add up to the time spent in them.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.phases = {}
+        self.counters = {}
+        self._contexts = {}
+        self._stack = []
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        """Returns a context manager adding the time spent in it to the name phase"""
+        context = self._contexts.get(name)
+        if context is None:
+            context = self._contexts[name] = _Phase(self, name)
+        return context
+
+    def _enter(self, name):
+        now = time.monotonic()
+        if self._stack:
+            parent, started = self._stack[-1]
+            self.phases[parent] = self.phases.get(parent, 0.0) + now - started
+        self._stack.append((name, now))
+
+    def _exit(self):
+        now = time.monotonic()
+        name, started = self._stack.pop()
+        self.phases[name] = self.phases.get(name, 0.0) + now - started
+        if self._stack:
+            # the parent phase goes on from now
+            self._stack[-1] = (self._stack[-1][0], now)
+
+    def timed(self, iterable, name):
+        """Yields the items of iterable adding the time spent producing them to the name phase"""
+        iterator = iter(iterable)
+        phase = self.phase(name)
+        while True:
+            with phase:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self):
+        return {
+            "total": round(time.monotonic() - self.started, 3),
+            "phases": {name: round(seconds, 3) for name, seconds in self.phases.items()},
+            **self.counters,
+        }
+
+
+class _Phase:
+    """Reusable context manager of a phase, so timing a phase does not allocate a new one every time"""
+
+    __slots__ = ("stats", "name")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stats._enter(self.name)
+
+    def __exit__(self, *exc_info):
+        self.stats._exit()
+
+
+def project_asset(asset, fields, exclude_fields):
+    """Returns the asset with only the given fields, all when none are given, and without the excluded ones"""
+    if fields:
+        asset = {key: asset[key] for key in fields if key in asset}
+    if exclude_fields:
+        asset = {key: value for key, value in asset.items() if key not in exclude_fields}
+    return asset
+
+
+def normalize_exported_asset(asset):
+    """Adds the workbench names of the exported asset fields, existing fields are kept as they are"""
+    for name, export_name in EXPORT_FIELD_ALIASES.items():
+        if name not in asset and export_name in asset:
+            asset[name] = asset[export_name]
+    return asset
+
 
 class ConstructableWithLookup(Constructable):
     def _compose(self, template, variables):
@@ -223,6 +612,8 @@ class ConstructableWithLookup(Constructable):
 class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
     NAME = "tenable"
     _sanitize_group_name = staticmethod(orig_safe)
+    _details_cache = None
+    _stats = None
 
     def verify_file(self, path):
         if super(InventoryModule, self).verify_file(path):
@@ -236,12 +627,16 @@ class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
         """Parses the inventory file"""
         super(InventoryModule, self).parse(inventory, loader, path)
         self._read_config_data(path)
+        stats = self._stats = InventoryStats()
+        # the inventory is shared with the other sources, only the hosts and groups of this one are reported
+        hosts, groups = len(inventory.hosts), len(inventory.groups)
 
         self.display.vv("Initializing Tenable API client")
         try:
             access_key = self.get_option("access_key")
             secret_key = self.get_option("secret_key")
-            api_client = init_tenable_api(access_key=access_key, secret_key=secret_key)
+            with stats.phase("client"):
+                api_client = init_tenable_api(access_key=access_key, secret_key=secret_key)
         except Exception as e:
             self.display.error(f"Failed to initialize Tenable API client: {str(e)}")
             return
@@ -250,6 +645,8 @@ class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
         filter_search_type = self.get_option("filter_search_type", "")
         all_fields = self.get_option("all_fields", "")
         full_info = self.get_option("full_info", False)
+        source = self.get_option("source")
+        asset_source = self.get_option("asset_source") if source == "assets" else source
         date_range = self.get_option("date_range", 30)
 
         self.display.vvv(
@@ -261,26 +658,99 @@ class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
         self.display.vvv(f"Adding custom filters: {filters}")
         query_parameters = add_custom_filters(query_parameters, filters, handle_multiple_filters)
 
-        cache_key = self.get_cache_key(path)
+        cache_key = self.get_query_cache_key(api_client, asset_source, query_parameters)
         cache_enabled = self.get_option("cache")
 
         self.display.vvv(f"Checking cache: enabled={cache_enabled}, key={cache_key}")
-        resources = self._cache.get(cache_key) if cache_enabled and self._cache.get(cache_key) else None
-
-        if not resources:
+        with stats.phase("cache_read"):
+            resources = self._cache.get(cache_key) if cache_enabled else None
+        stats.count("inventory_cache_hits" if resources else "inventory_cache_misses")
+
+        if asset_source == "export" and cache_enabled and self.get_option("incremental"):
+            self.display.vv("Syncing exported assets with the cached ones")
+            with stats.phase("fetch"):
+                resources = self.sync_exported_assets(api_client, f"{cache_key}_incremental")
+        elif not resources and asset_source in SOURCE_ENDPOINTS:
+            self.display.vv(f"Fetching {source} from Tenable API")
+            # pages are streamed into the inventory unless they have to be cached
+            resources = self.fetch_paged_items(api_client, SOURCE_ENDPOINTS[source])
+            if cache_enabled:
+                with stats.phase("fetch"):
+                    resources = list(resources)
+                self.display.vv(f"Caching fetched {source}")
+                with stats.phase("cache_write"):
+                    self._cache[cache_key] = resources
+        elif not resources and asset_source == "export":
+            self.display.vv("Exporting assets from Tenable API")
+            # the export is streamed into the inventory unless it has to be cached
+            resources = self.fetch_exported_assets(api_client)
+            if cache_enabled:
+                with stats.phase("fetch"):
+                    resources = list(resources)
+                self.display.vv("Caching exported assets")
+                with stats.phase("cache_write"):
+                    self._cache[cache_key] = resources
+        elif not resources:
             self.display.vv("Fetching assets from Tenable API")
             try:
-                resources = self.fetch_assets(api_client, query_parameters)
+                with stats.phase("fetch"):
+                    resources = self.fetch_assets(api_client, query_parameters)
                 if cache_enabled and resources:
                     self.display.vv("Caching fetched assets")
-                    self._cache.set(cache_key, resources)
+                    with stats.phase("cache_write"):
+                        self._cache[cache_key] = resources
             except Exception as e:
                 self.display.error(f"Error fetching assets: {str(e)}")
                 return
 
+        full_info = full_info and asset_source == "workbench"
+        if full_info and self.get_option("asset_details_cache"):
+            self._details_cache = get_response_cache(
+                enabled=True,
+                directory=self.get_option("asset_details_cache_dir"),
+                max_size=self.get_option("asset_details_cache_max_size"),
+                name="tenable-asset-details",
+            )
+            if self._details_cache is None:
+                self.display.warning("The asset details cache can not be used, details are fetched from the API")
+
         if resources:
             self.display.vv("Populating inventory with fetched assets")
-            self.populate_inventory(resources, api_client, full_info)
+            self.populate_inventory(resources, api_client, full_info, source=source)
+
+        stats.count("requests_sent", api_client.requests_sent)
+        stats.count("retries", api_client.retries)
+        stats.count("bytes_received", api_client.bytes_received)
+        stats.count("hosts", len(inventory.hosts) - hosts)
+        stats.count("groups", len(inventory.groups) - groups)
+        self.report_stats(stats, source, asset_source)
+
+    def report_stats(self, stats, source, asset_source):
+        """Displays the stats of the parse with -vv and appends them to stats_file when set"""
+        report = {"source": source, "asset_source": asset_source, **stats.as_dict()}
+        self.display.vv(f"Tenable inventory stats: {json.dumps(report)}")
+
+        stats_file = self.get_option("stats_file")
+        if stats_file:
+            try:
+                with open(stats_file, "a") as f:
+                    f.write(json.dumps({"timestamp": int(time.time()), **report}) + "\n")
+            except OSError as e:
+                self.display.warning(f"Failed to write the inventory stats to {stats_file}: {str(e)}")
+
+    def get_query_cache_key(self, api_client, asset_source, query_parameters):
+        """Returns the cache key of the assets, derived from the account and the query they were fetched with.
+
+        Any change of the query gets its own key, while inventory sources running the same query share it.
+        """
+        if asset_source == "export":
+            query = {"filters": self.get_option("export_filters") or {}}
+        elif asset_source in SOURCE_ENDPOINTS:
+            query = {}
+        else:
+            query = query_parameters
+        digest = canonical_hash({"access_key": api_client.access_key, "source": asset_source, "query": query})
+        return f"{self.NAME}_{digest[:32]}"
 
     def fetch_assets(self, api_client, query_parameters):
         """Fetches assets from Tenable API using the constructed query parameters"""
@@ -294,6 +764,120 @@ class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
             self.display.error(f"Failed to fetch assets from Tenable: {str(e)}")
             return []
 
+    def sync_exported_assets(self, api_client, cache_key):
+        """Merges the assets updated and deleted since the last sync into the cached ones and caches the result"""
+        snapshot = self._cache.get(cache_key)
+        synced_at = int(time.time())
+
+        if not snapshot:
+            self.display.vv("No synced assets cached, exporting every asset")
+            assets = {asset["id"]: asset for asset in self.fetch_exported_assets(api_client)}
+        else:
+            watermark = snapshot["watermark"]
+            assets = {asset["id"]: asset for asset in snapshot["assets"]}
+            self.display.vv(f"Exporting assets changed since {watermark}")
+            updated = deleted = 0
+            for asset in self.fetch_exported_assets(api_client, {"updated_at": watermark}):
+                if asset.get("deleted_at"):
+                    deleted += assets.pop(asset["id"], None) is not None
+                else:
+                    assets[asset["id"]] = asset
+                    updated += 1
+            for asset in self.fetch_exported_assets(api_client, {"deleted_at": watermark}):
+                deleted += assets.pop(asset["id"], None) is not None
+            self.display.vv(
+                f"Merged {updated} updated and {deleted} deleted assets into {len(snapshot['assets'])} cached"
+            )
+
+        resources = list(assets.values())
+        self._cache[cache_key] = {"watermark": synced_at, "assets": resources}
+        return resources
+
+    def fetch_exported_assets(self, api_client, filters=None):
+        """Exports the assets and yields them, downloading a bounded number of chunks at a time"""
+        concurrency = max(1, self.get_option("export_concurrency"))
+        body = {"chunk_size": self.get_option("export_chunk_size")}
+        filters = {**(self.get_option("export_filters") or {}), **(filters or {})}
+        if filters:
+            body["filters"] = filters
+
+        try:
+            self.display.vvvv(f"Requesting asset export with: {body}")
+            export_uuid = api_client.request("POST", "assets/export", data=body)["data"]["export_uuid"]
+            self.display.vv(f"Asset export {export_uuid} requested")
+
+            def fetch_chunk(chunk_id):
+                self.display.vvv(f"Downloading chunk {chunk_id} of asset export {export_uuid}")
+                return api_client.request("GET", f"assets/export/{export_uuid}/chunks/{chunk_id}")["data"] or []
+
+            chunk_ids = self.iter_export_chunk_ids(api_client, export_uuid)
+            for assets in self.iter_concurrently(fetch_chunk, chunk_ids, concurrency):
+                for asset in assets:
+                    yield normalize_exported_asset(asset)
+        except TenableAPIError as e:
+            raise AnsibleError(f"Error exporting assets from Tenable: {str(e)}")
+
+    def fetch_paged_items(self, api_client, endpoint):
+        """Yields the items of an offset paginated endpoint, downloading a bounded number of pages at a time"""
+        pagination = get_pagination(endpoint)
+        page_size = pagination["page_size"]
+        concurrency = max(1, self.get_option("page_concurrency"))
+
+        def fetch_page(offset):
+            self.display.vvv(f"Fetching {endpoint} from offset {offset}")
+            return api_client.request("GET", endpoint, params={"limit": page_size, "offset": offset})["data"]
+
+        try:
+            # the first page tells how many items there are, the rest of pages are then fetched concurrently
+            first_page = fetch_page(0)
+            items = get_nested_value(first_page, pagination["data_key"]) or []
+            yield from items
+
+            total = get_nested_value(first_page, "pagination.total")
+            if total is None:
+                if len(items) == page_size:
+                    yield from api_client.paginate(endpoint, params={"offset": page_size})
+                return
+
+            offsets = range(page_size, int(total), page_size)
+            for page in self.iter_concurrently(fetch_page, offsets, concurrency):
+                yield from get_nested_value(page, pagination["data_key"]) or []
+        except TenableAPIError as e:
+            raise AnsibleError(f"Error fetching {endpoint} from Tenable: {str(e)}")
+
+    def iter_concurrently(self, func, args, concurrency):
+        """Yields func(arg) for each of args in order, with at most concurrency results running or waiting"""
+        args = iter(args)
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque(executor.submit(func, arg) for arg in islice(args, concurrency))
+            while pending:
+                result = pending.popleft().result()
+                for arg in islice(args, 1):
+                    pending.append(executor.submit(func, arg))
+                yield result
+
+    def iter_export_chunk_ids(self, api_client, export_uuid):
+        """Polls the status of the export and yields its chunks as they become available"""
+        poll_interval = self.get_option("export_poll_interval")
+        deadline = time.monotonic() + self.get_option("export_timeout")
+        seen = set()
+        while True:
+            status = api_client.request("GET", f"assets/export/{export_uuid}/status")["data"]
+            self.display.vvvv(f"Asset export status: {status}")
+            available = [chunk_id for chunk_id in sorted(status.get("chunks_available", [])) if chunk_id not in seen]
+            for chunk_id in available:
+                seen.add(chunk_id)
+                yield chunk_id
+
+            if status.get("status") == "FINISHED":
+                return
+            if status.get("status") in ("ERROR", "CANCELLED"):
+                raise AnsibleError(f"Asset export {export_uuid} ended with status {status.get('status')}")
+            if time.monotonic() > deadline:
+                raise AnsibleError(f"Asset export {export_uuid} did not finish in {self.get_option('export_timeout')}s")
+            if not available:
+                time.sleep(poll_interval)
+
     def fetch_asset_details(self, api_client, asset_id):
         """Fetches detailed information for a given asset"""
         endpoint = f"assets/{asset_id}"
@@ -306,31 +890,127 @@ class InventoryModule(BaseInventoryPlugin, ConstructableWithLookup, Cacheable):
             self.display.error(f"Failed to fetch asset details for {asset_id}: {str(e)}")
             return None
 
-    def populate_inventory(self, assets, api_client, full_info):
+    def fetch_cached_asset_details(self, api_client, asset):
+        """Returns the details of the asset from the asset details cache, fetching them when missing or outdated"""
+        version = asset.get("updated_at") or asset.get("last_seen")
+        if self._details_cache is None or not version:
+            return self.fetch_asset_details(api_client, asset["id"])
+
+        key = ResponseCache.make_key(api_client.access_key, "GET", f"assets/{asset['id']}?updated_at={version}")
+        details = self._details_cache.get(key)
+        if self._stats is not None:
+            self._stats.count("asset_details_cache_misses" if details is None else "asset_details_cache_hits")
+        if details is not None:
+            self.display.vvvv(f"Asset details of {asset['id']} read from cache")
+            return details
+
+        details = self.fetch_asset_details(api_client, asset["id"])
+        if details:
+            self._details_cache.set(key, details, self.get_option("asset_details_cache_ttl"))
+        return details
+
+    def iter_asset_details(self, api_client, assets, concurrency):
+        """Yields the details of each asset, in order, with at most concurrency of them fetched ahead"""
+        if concurrency <= 1:
+            for asset in assets:
+                yield self.fetch_cached_asset_details(api_client, asset) or asset
+            return
+
+        self.display.vv(f"Fetching asset details with {concurrency} workers")
+        # executor.map would submit every asset at once, holding all their details until hosts are added
+        yield from self.iter_concurrently(
+            lambda asset: self.fetch_cached_asset_details(api_client, asset) or asset, assets, concurrency
+        )
+
+    def populate_inventory(self, assets, api_client, full_info, source="assets"):
         """Populates the Ansible inventory with fetched assets based on tag filters."""
-        for asset in assets:
-            self.display.vvvv(f"Processing asset: {asset['id']}")
+        if self._stats is None:
+            self._stats = InventoryStats()
+        stats = self._stats
+
+        with stats.phase("populate"):
+            # streamed sources fetch while they are iterated, that time is accounted to their own phase
+            assets = stats.timed(assets, "fetch")
             if full_info:
-                asset = self.fetch_asset_details(api_client, asset["id"]) or asset
-            host_name = self.get_hostname_of_asset(asset)
-            if host_name:
-                self.display.vvv(f"Adding host to inventory: {host_name}")
-                host = self.inventory.add_host(host_name)
-                self.inventory.set_variable(host, "asset_details", asset)
-                self._set_composite_vars(self.get_option("compose"), asset, host, self.get_option("strict"))
-                self._add_host_to_composed_groups(self.get_option("groups"), asset, host, self.get_option("strict"))
-                self._add_host_to_keyed_groups(self.get_option("keyed_groups"), asset, host, self.get_option("strict"))
-
-    def get_hostname_of_asset(self, asset):
+                details = self.iter_asset_details(api_client, assets, self.get_option("full_info_concurrency"))
+                assets = stats.timed(details, "enrichment")
+            fields = self.get_option("hostvars_fields")
+            exclude_fields = set(self.get_option("exclude_fields") or [])
+            fast_groups = self.compile_fast_groups(source)
+            group_names = {}
+            for asset in assets:
+                self.display.vvvv(f"Processing {source}: {asset.get('id', asset.get('uuid'))}")
+                host_name = self.get_hostname_of_asset(asset, source)
+                if host_name:
+                    self.display.vvv(f"Adding host to inventory: {host_name}")
+                    host = self.inventory.add_host(host_name)
+                    with stats.phase("grouping"):
+                        self.add_host_to_fast_groups(fast_groups, asset, host, group_names)
+                    asset = project_asset(asset, fields, exclude_fields)
+                    self.inventory.set_variable(host, "asset_details", asset)
+                    strict = self.get_option("strict")
+                    with stats.phase("templating"):
+                        self._set_composite_vars(self.get_option("compose"), asset, host, strict)
+                        self._add_host_to_composed_groups(self.get_option("groups"), asset, host, strict)
+                        self._add_host_to_keyed_groups(self.get_option("keyed_groups"), asset, host, strict)
+
+    def compile_fast_groups(self, source="assets"):
+        """Returns the groups built without templating as (kind, key, name_prefix, parent_group) tuples"""
+        fast_groups = []
+        if source == "agents":
+            fast_groups.append(("names", "groups", self.get_option("agent_group_prefix"), None))
+        for option, key_name in (("tag_groups", "category"), ("field_groups", "field")):
+            for entry in self.get_option(option) or []:
+                if not isinstance(entry, dict) or not entry.get(key_name):
+                    raise AnsibleParserError(f"Every {option} entry must be a dictionary with a {key_name}: {entry}")
+                prefix = entry.get("prefix", "")
+                separator = entry.get("separator", "_")
+                if prefix == "" and self.get_option("leading_separator") is False:
+                    separator = ""
+                kind = "tag" if option == "tag_groups" else "field"
+                fast_groups.append((kind, entry[key_name], f"{prefix}{separator}", entry.get("parent_group")))
+        return fast_groups
+
+    def add_host_to_fast_groups(self, fast_groups, asset, host, group_names):
+        """Adds the host to the groups of its tags and fields, group_names keeps the groups already created"""
+        for kind, key, name_prefix, parent_group in fast_groups:
+            if kind == "tag":
+                values = [
+                    tag.get("tag_value", tag.get("value"))
+                    for tag in asset.get("tags") or []
+                    if tag.get("tag_key", tag.get("key")) == key
+                ]
+            elif kind == "names":
+                values = [item.get("name") for item in asset.get(key) or [] if isinstance(item, dict)]
+            else:
+                values = asset.get(key)
+                if not isinstance(values, list):
+                    values = [values]
+
+            for value in values:
+                if value in (None, "") or isinstance(value, (dict, list)):
+                    continue
+                raw_name = f"{name_prefix}{value}"
+                group = group_names.get(raw_name)
+                if group is None:
+                    group = group_names[raw_name] = self.inventory.add_group(self._sanitize_group_name(raw_name))
+                    if parent_group:
+                        parent = self.inventory.add_group(self._sanitize_group_name(parent_group))
+                        self.inventory.add_child(parent, group)
+                self.inventory.add_host(host, group)
+
+    def get_hostname_of_asset(self, asset, source="assets"):
         """Determines the hostname from asset."""
         hostname_sources = self.get_option("hostname_sources", ["hostname", "agent_name", "id", "fqdn"])
+        first, last = SOURCE_HOSTNAME_FIELDS[source]
+        hostname_sources = first + list(hostname_sources) + last
         prefix = self.get_option("hostname_prefix", "")
         suffix = self.get_option("hostname_suffix", "")
         separator = self.get_option("hostname_separator", "")
 
         for key in hostname_sources:
             if key in asset and asset[key]:
-                base_name = asset[key][0] if isinstance(asset[key], list) else asset[key]
+                base_name = str(asset[key][0] if isinstance(asset[key], list) else asset[key])
                 return f"{prefix}{separator}{base_name}{separator}{suffix}" if (prefix or suffix) else base_name
 
         self.display.warning("No valid host name found, using 'unknown_host'")
@@ -1,16 +1,165 @@
+import asyncio
+import functools
+import http.client
 import json
 import mimetypes
 import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from types import MappingProxyType
 from urllib.parse import urlencode
 
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 from ansible.module_utils.six.moves.urllib.error import URLError
-from ansible.module_utils.urls import Request
 
 from .exceptions import AuthenticationError
 from .exceptions import BadRequestError
 from .exceptions import TenableAPIError
 from .exceptions import UnexpectedAPIResponse
+from .rate_limiter import get_rate_limiter
+from .response_cache import ResponseCache
+from .response_cache import get_cache_ttl
+from .response_cache import get_response_cache
+from .transport import MultipartFileEncoder
+from .transport import get_connection_pool
+
+# endpoint families of the list endpoints and how each one walks its pages:
+# "offset" uses limit/offset and pagination.total, "page" uses page/size and total_count
+PAGINATION_STYLES = (
+    (re.compile(r"^scanners/[^/]+/agents$"), {"style": "offset", "data_key": "agents", "page_size": 5000}),
+    (
+        re.compile(r"^scanners/[^/]+/agent-groups/[^/]+/agents$"),
+        {"style": "offset", "data_key": "agents", "page_size": 5000},
+    ),
+    (re.compile(r"^plugins/plugin$"), {"style": "page", "data_key": "data.plugin_details", "page_size": 1000}),
+    (re.compile(r"^networks$"), {"style": "offset", "data_key": "networks", "page_size": 1000}),
+)
+
+# 429 means the request was rejected before being processed, so any method can be sent again
+RETRY_ANY_METHOD_STATUS_CODES = (429,)
+RETRY_IDEMPOTENT_STATUS_CODES = (502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def parse_retry_after(value):
+    """Returns the seconds to wait from a Retry-After header holding either seconds or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    """Decides whether a failed call is sent again and how long to wait before it.
+
+    429 is retried for every method, 502, 503, 504 and connection errors only for idempotent methods.
+    The wait honours Retry-After and otherwise is an exponential backoff with full jitter. Each call
+    is retried at most max_retries times and waits at most budget seconds in total.
+    """
+
+    def __init__(self, max_retries=None, backoff_factor=1.0, max_backoff=60.0, budget=300.0):
+        if max_retries is None:
+            max_retries = int(os.getenv("TENABLE_MAX_RETRIES", 3))
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.budget = budget
+
+    def is_retryable(self, method, status_code=None):
+        if status_code in RETRY_ANY_METHOD_STATUS_CODES:
+            return True
+        if method.upper() not in IDEMPOTENT_METHODS:
+            return False
+        return status_code is None or status_code in RETRY_IDEMPOTENT_STATUS_CODES
+
+    def get_delay(self, method, attempt, waited, status_code=None, retry_after=None):
+        """Returns the seconds to sleep before the next attempt or None when the call must not be retried."""
+        if attempt >= self.max_retries or not self.is_retryable(method, status_code):
+            return None
+        delay = parse_retry_after(retry_after)
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2**attempt))
+        if waited + delay > self.budget:
+            return None
+        return delay
+
+
+def get_pagination(endpoint):
+    """Returns the pagination settings of the endpoint family the endpoint belongs to."""
+    for pattern, pagination in PAGINATION_STYLES:
+        if pattern.match(endpoint):
+            return dict(pagination)
+    raise ValueError(f"No pagination is known for endpoint {endpoint}.")
+
+
+def get_nested_value(data, data_key):
+    """Gets a value of a nested dict using a dotted key like data.plugin_details."""
+    for key in data_key.split("."):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def map_http_error(e):
+    """Returns the collection exception for an HTTPError returned by the API."""
+    error_data = e.read().decode("utf-8")
+    if e.code == 400:
+        return BadRequestError(error_data, e.code)
+    elif e.code == 401:
+        return AuthenticationError("Authentication failure. Please check your API keys.", e.code)
+    else:
+        return UnexpectedAPIResponse(e.code, error_data)
+
+
+def get_validator(headers):
+    """Returns the ETag or Last-Modified of a response usable in If-Range, weak ETags are not."""
+    if not headers:
+        return None
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def parse_content_range(value):
+    """Returns the first byte, last byte and total of a Content-Range header, None for the missing ones."""
+    match = re.match(r"^bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$", (value or "").strip())
+    if not match:
+        return None, None, None
+    return tuple(int(group) if group and group != "*" else None for group in match.groups())
+
+
+def read_part_validator(meta_path, url):
+    """Returns the validator saved for a part file of the url, None when it belongs to another download."""
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(meta, dict) or meta.get("url") != url:
+        return None
+    return meta.get("validator")
+
+
+def remove_files(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
 
 def get_tenable_credentials(module=None):
@@ -36,9 +185,33 @@ def get_tenable_credentials(module=None):
 
 
 class TenableAPI:
-    """API client class for Tenable."""
+    """API client class for Tenable.
+
+    Requests go through a process wide pool of keep-alive connections, sized with pool_size and
+    idle_timeout (or the TENABLE_POOL_SIZE and TENABLE_POOL_IDLE_TIMEOUT environment variables).
+    Failed calls are retried following retry_policy, retries counts how many retries were made,
+    requests_sent the HTTP requests sent, retries included, and bytes_received the response bytes.
+    With rate_limit (or TENABLE_RATE_LIMIT) every call, retries included, first takes a token from a
+    bucket shared by all the processes of the controller using the same API key.
+    headers are read-only defaults, each call merges them with its own headers so a single
+    instance can be shared by many threads.
+    With use_cache (or TENABLE_RESPONSE_CACHE) GET calls to near static endpoints such as filters and
+    templates are served from an on-disk cache for their TTL, or cache_ttl seconds when given.
+    """
 
-    def __init__(self, module=None, access_key=None, secret_key=None):
+    def __init__(
+        self,
+        module=None,
+        access_key=None,
+        secret_key=None,
+        pool_size=None,
+        idle_timeout=None,
+        retry_policy=None,
+        rate_limit=None,
+        rate_limit_burst=None,
+        cache=None,
+        cache_ttl=None,
+    ):
         self.module = module
         self.base_url = "https://cloud.tenable.com"
 
@@ -51,69 +224,301 @@ class TenableAPI:
         if not self.access_key or not self.secret_key:
             raise ValueError("Access key and secret key are required for Tenable API.")
 
-        self.headers = {
-            "Accept": "application/json",
-            "X-ApiKeys": f"accessKey={self.access_key};secretKey={self.secret_key}",
-        }
-        self.client = Request(validate_certs=True, timeout=30)
+        self.headers = MappingProxyType(
+            {
+                "Accept": "application/json",
+                "X-ApiKeys": f"accessKey={self.access_key};secretKey={self.secret_key}",
+            }
+        )
+        self.client = get_connection_pool(pool_size=pool_size, idle_timeout=idle_timeout)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retries = 0
+        self.requests_sent = 0
+        self.bytes_received = 0
+        self._counters_lock = threading.Lock()
+        self.rate_limiter = get_rate_limiter(self.access_key, rate=rate_limit, burst=rate_limit_burst)
+
+        use_cache = None
+        if module:
+            use_cache = module.params.get("use_cache") or None
+            cache_ttl = module.params.get("cache_ttl") or cache_ttl
+        self.cache = cache if cache is not None else get_response_cache(enabled=use_cache)
+        self.cache_ttl = cache_ttl
+
+    def _open(self, method: str, url: str, headers: dict, data=None):
+        """Opens the url retrying the failures allowed by the retry policy."""
+        attempt = 0
+        waited = 0.0
+        while True:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            self._count(requests_sent=1)
+            try:
+                return self.client.open(method=method, url=url, headers=headers, data=data)
+            except HTTPError as e:
+                retry_after = e.headers.get("Retry-After") if e.headers else None
+                delay = self.retry_policy.get_delay(method, attempt, waited, e.code, retry_after)
+                if delay is None:
+                    raise
+                # the body is read so the connection goes back to the pool
+                e.read()
+            except (URLError, TimeoutError):
+                delay = self.retry_policy.get_delay(method, attempt, waited)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+            waited += delay
+            self._count(retries=1)
+
+    def _count(self, retries=0, requests_sent=0, bytes_received=0):
+        with self._counters_lock:
+            self.retries += retries
+            self.requests_sent += requests_sent
+            self.bytes_received += bytes_received
 
-    def request(self, method: str, endpoint: str, params: dict = None, data: dict = None) -> dict:
+    def _build_headers(self, headers: dict = None, **extra) -> dict:
+        """Returns a new dict with the default headers, the call headers and the extra ones, in that order."""
+        merged = dict(self.headers)
+        merged.update(headers or {})
+        merged.update(extra)
+        return merged
+
+    def request(self, method: str, endpoint: str, params: dict = None, data: dict = None, headers: dict = None) -> dict:
         url = f"{self.base_url}/{endpoint}"
         if params:
             query_string = urlencode(params, doseq=True)
             url += f"?{query_string}"
 
+        cache_key = None
+        ttl = self.cache_ttl or get_cache_ttl(endpoint)
+        if self.cache is not None and method == "GET" and ttl:
+            cache_key = ResponseCache.make_key(self.access_key, method, url)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        headers = self._build_headers(headers)
         if data:
             data = json.dumps(data).encode("utf-8")
             if method in ["PATCH", "POST", "PUT"]:
-                self.headers["Content-Type"] = "application/json"
-        else:
-            self.headers.pop("Content-Type", None)
+                headers["Content-Type"] = "application/json"
 
         try:
-            response = self.client.open(method=method, url=url, headers=self.headers, data=data)
+            response = self._open(method, url, headers, data=data)
             response_body = response.read()
+            self._count(bytes_received=len(response_body))
             if response_body:
-                return {"status_code": response.getcode(), "data": json.loads(response_body.decode("utf-8"))}
+                result = {"status_code": response.getcode(), "data": json.loads(response_body.decode("utf-8"))}
             else:
-                return {"status_code": response.getcode(), "data": {}}
+                result = {"status_code": response.getcode(), "data": {}}
+            if cache_key:
+                self.cache.set(cache_key, result, ttl)
+            return result
         except HTTPError as e:
-            error_data = e.read().decode("utf-8")
-            if e.code == 400:
-                raise BadRequestError(error_data, e.code)
-            elif e.code == 401:
-                raise AuthenticationError("Authentication failure. Please check your API keys.", e.code)
-            else:
-                raise UnexpectedAPIResponse(e.code, error_data)
+            raise map_http_error(e)
         except URLError as e:
             raise TenableAPIError(f"URL error occurred: {str(e)}", None)
         except TimeoutError as e:
             raise TenableAPIError(f"Request timed out: {str(e)}", None)
 
-    def upload_file(self, endpoint: str, file_path: str) -> dict:
+    def request_many(self, requests: list, max_workers: int = None) -> list:
+        """Runs many calls on a bounded thread pool and returns their responses in the same order.
+
+        Each call is a dict with method and endpoint and optionally params, data and headers. Calls go
+        through request, so retries and rate limiting apply to each of them. A failed call returns
+        {"status_code": ..., "error": ...} in its place instead of failing the others, with status_code
+        None when the failure is not an API error.
+        """
+        if not requests:
+            return []
+
+        def run(spec):
+            try:
+                return self.request(
+                    spec.get("method", "GET"),
+                    spec["endpoint"],
+                    params=spec.get("params"),
+                    data=spec.get("data"),
+                    headers=spec.get("headers"),
+                )
+            except TenableAPIError as e:
+                return {"status_code": e.status_code, "error": str(e)}
+            except Exception as e:
+                # an unreadable body or a local failure only fails its own call
+                return {"status_code": None, "error": str(e)}
+
+        max_workers = max_workers or self.client.pool_size
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(requests))) as executor:
+            return list(executor.map(run, requests))
+
+    def paginate(self, endpoint: str, params: dict = None, pagination: dict = None):
+        """Yields every item of a list endpoint, holding a single page in memory at a time.
+
+        The cursor style, the key holding the items and the page size come from the endpoint family
+        in PAGINATION_STYLES unless a pagination dict is given. A limit or size in params is used as
+        the page size and an offset or page in params as the starting point.
+        """
+        pagination = pagination or get_pagination(endpoint)
+        style = pagination["style"]
+        data_key = pagination["data_key"]
+        params = dict(params or {})
+
+        if style == "offset":
+            page_size = int(params.get("limit") or pagination["page_size"])
+            params["limit"] = page_size
+            params["offset"] = int(params.get("offset") or 0)
+        elif style == "page":
+            page_size = int(params.get("size") or pagination["page_size"])
+            params["size"] = page_size
+            params["page"] = int(params.get("page") or 1)
+        else:
+            raise ValueError(f"Unknown pagination style {style}.")
+
+        while True:
+            response = self.request("GET", endpoint, params=dict(params))
+            items = get_nested_value(response["data"], data_key) or []
+            for item in items:
+                yield item
+
+            if len(items) < page_size:
+                return
+            if style == "offset":
+                params["offset"] += len(items)
+                total = get_nested_value(response["data"], "pagination.total")
+                if total is not None and params["offset"] >= int(total):
+                    return
+            else:
+                total = response["data"].get("total_count")
+                if total is not None and params["page"] * page_size >= int(total):
+                    return
+                params["page"] += 1
+
+    def download(
+        self,
+        endpoint: str,
+        file_path: str,
+        accept: str = "application/octet-stream",
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        resume: bool = True,
+        headers: dict = None,
+    ) -> dict:
+        """Streams the response body to file_path in chunks, without holding it in memory.
+
+        The body is written to file_path.part and renamed to file_path once complete. When the
+        transfer is interrupted it goes on with a Range request from the bytes already written,
+        within this call following the retry policy or in a later call when resume is true. A part
+        file is only resumed for the same URL and with If-Range set to the ETag or Last-Modified of
+        its first response, kept in file_path.part.json, so a changed body is downloaded again.
+        """
         url = f"{self.base_url}/{endpoint}"
-        file_name = os.path.basename(file_path)
-        content_type, unused_mime_type = mimetypes.guess_type(file_path)
-        if content_type is None:
-            content_type = "application/octet-stream"
+        part_path = f"{file_path}.part"
+        meta_path = f"{part_path}.json"
+        validator = read_part_validator(meta_path, url) if resume else None
+        if not validator:
+            # nothing proves the part file belongs to this body
+            remove_files(part_path, meta_path)
+
+        start = time.monotonic()
+        resumed_from = None
+        transferred = 0
+        attempt = 0
+        waited = 0.0
+        while True:
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset and not validator:
+                remove_files(part_path)
+                offset = 0
+            call_headers = self._build_headers(headers, Accept=accept)
+            if offset:
+                call_headers["Range"] = f"bytes={offset}-"
+                call_headers["If-Range"] = validator
 
-        boundary = "----WebKitFormBoundary7MA4YWxkTrZu0gW"
-        self.headers["Content-Type"] = f"multipart/form-data; boundary={boundary}"
-        data = []
-        data.append(f"--{boundary}")
-        data.append(f'Content-Disposition: form-data; name="Filedata"; filename="{file_name}"')
-        data.append(f"Content-Type: {content_type}")
-        data.append("")
+            try:
+                response = self._open("GET", url, call_headers)
+            except HTTPError as e:
+                if offset and e.code == 416:
+                    e.read()
+                    if parse_content_range(e.headers.get("Content-Range") if e.headers else None)[2] == offset:
+                        # the part file already holds the whole body
+                        status_code = e.code
+                        if resumed_from is None:
+                            resumed_from = offset
+                        break
+                    remove_files(part_path, meta_path)
+                    validator = None
+                    continue
+                raise map_http_error(e)
+            except URLError as e:
+                raise TenableAPIError(f"URL error occurred: {str(e)}", None)
+            except TimeoutError as e:
+                raise TenableAPIError(f"Request timed out: {str(e)}", None)
 
-        with open(file_path, "rb") as f:
-            data.append(f.read())
+            status_code = response.getcode()
+            if offset:
+                if status_code != 206:
+                    # the body changed or the server ignored the range, it is sent whole again
+                    offset = 0
+                elif parse_content_range(response.headers.get("Content-Range"))[0] != offset:
+                    response.close()
+                    remove_files(part_path, meta_path)
+                    validator = None
+                    continue
+            if not offset:
+                validator = get_validator(response.headers)
+                if validator:
+                    with open(meta_path, "w") as f:
+                        json.dump({"url": url, "validator": validator}, f)
+                else:
+                    remove_files(meta_path)
+            if resumed_from is None:
+                resumed_from = offset
 
-        data.append(f"--{boundary}--")
-        data.append("")
-        data = "\r\n".join(data).encode("utf-8")
+            try:
+                with open(part_path, "ab" if offset else "wb") as f:
+                    while True:
+                        chunk = response.read(chunk_size)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        transferred += len(chunk)
+                        self._count(bytes_received=len(chunk))
+                break
+            except (OSError, http.client.HTTPException) as e:
+                response.close()
+                delay = self.retry_policy.get_delay("GET", attempt, waited)
+                if delay is None:
+                    raise TenableAPIError(f"Download interrupted: {str(e)}", None)
+                time.sleep(delay)
+                attempt += 1
+                waited += delay
+                self._count(retries=1)
+
+        os.replace(part_path, file_path)
+        remove_files(meta_path)
+        elapsed = time.monotonic() - start
+        return {
+            "status_code": status_code,
+            "path": file_path,
+            "size": os.path.getsize(file_path),
+            "resumed_from": resumed_from,
+            "elapsed": round(elapsed, 3),
+            "bytes_per_second": int(transferred / elapsed) if elapsed else transferred,
+        }
+
+    def upload_file(self, endpoint: str, file_path: str, headers: dict = None) -> dict:
+        """Uploads the file as multipart/form-data, streamed from disk so memory use does not grow with its size."""
+        url = f"{self.base_url}/{endpoint}"
+        content_type, unused_mime_type = mimetypes.guess_type(file_path)
+        if content_type is None:
+            content_type = "application/octet-stream"
 
         try:
-            response = self.client.open(method="POST", url=url, data=data, headers=self.headers)
+            with MultipartFileEncoder("Filedata", file_path, content_type) as body:
+                call_headers = self._build_headers(headers)
+                call_headers["Content-Type"] = body.content_type
+                call_headers["Content-Length"] = str(body.content_length)
+                response = self._open("POST", url, call_headers, data=body)
             response_body = response.read().decode("utf-8")
             return {"status_code": response.getcode(), "data": json.loads(response_body) if response_body else {}}
         except Exception as e:
@@ -123,5 +528,55 @@ class TenableAPI:
                 raise TenableAPIError(f"Failed to upload file: {str(e)}", None)
 
 
-def init_tenable_api(module=None, access_key=None, secret_key=None):
-    return TenableAPI(module=module, access_key=access_key, secret_key=secret_key)
+class AsyncTenableAPI:
+    """asyncio client for Tenable, with the same error mapping as TenableAPI.
+
+    Calls run on a bounded thread pool through the keep-alive connections of TenableAPI, so the
+    event loop never blocks. At most max_concurrency calls are in flight, the rest wait on a
+    semaphore. Cancelling a call releases its slot at once, the request still running in the pool
+    is left to finish on its own.
+    """
+
+    def __init__(self, api=None, max_concurrency=10, **kwargs):
+        self.api = api or TenableAPI(**kwargs)
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore = None
+
+    async def _run(self, func, *args, **kwargs):
+        # created on first use so it belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def request(
+        self, method: str, endpoint: str, params: dict = None, data: dict = None, headers: dict = None
+    ) -> dict:
+        return await self._run(self.api.request, method, endpoint, params=params, data=data, headers=headers)
+
+    async def download(self, endpoint: str, file_path: str, **kwargs) -> dict:
+        return await self._run(self.api.download, endpoint, file_path, **kwargs)
+
+    async def gather(self, *calls):
+        """Runs request calls given as (method, endpoint, params, data) tuples concurrently, results in order.
+
+        A failed call returns its exception in place of the response instead of cancelling the others.
+        """
+        return await asyncio.gather(*(self.request(*call) for call in calls), return_exceptions=True)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+def init_tenable_api(module=None, access_key=None, secret_key=None, pool_size=None, idle_timeout=None):
+    return TenableAPI(
+        module=module, access_key=access_key, secret_key=secret_key, pool_size=pool_size, idle_timeout=idle_timeout
+    )
@@ -53,6 +53,9 @@ ARG_SPECS = {
     "last_updated": {"type": "str", "required": False},
     "page": {"type": "int", "required": False},
     "size": {"type": "int", "required": False},
+    "fetch_all": {"type": "bool", "required": False, "default": False},
+    "use_cache": {"type": "bool", "required": False, "default": False},
+    "cache_ttl": {"type": "int", "required": False},
     "assets_ttl_days": {"type": "int", "required": False},
     "schedule": {
         "type": "dict",
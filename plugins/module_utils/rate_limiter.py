@@ -0,0 +1,101 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+import fcntl
+import hashlib
+import os
+import struct
+import threading
+import time
+
+from .exceptions import TenableAPIError
+from .user_dir import get_user_directory
+
+# tokens left and the time they were computed at
+STATE_FORMAT = "dd"
+STATE_SIZE = struct.calcsize(STATE_FORMAT)
+
+
+class RateLimiter:
+    """Token bucket shared by every process and thread of the controller that uses the same API key.
+
+    The bucket lives in a small state file guarded with flock, so the Ansible forks, the inventory
+    and any other process throttle together to rate requests per second with bursts up to burst.
+    The file is kept in a directory private to the user, a state file that can not be used raises
+    TenableAPIError.
+    """
+
+    def __init__(self, rate: float, burst: float = None, key: str = "", directory: str = None):
+        if rate <= 0:
+            raise ValueError("The rate limit must be greater than 0 requests per second.")
+        if burst is not None and burst < 1:
+            raise ValueError("The rate limit burst must be at least 1 request.")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self._directory = directory or os.getenv("TENABLE_RATE_LIMIT_DIR")
+        self._digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        self.path = None
+        self._lock = threading.Lock()
+
+    def _open_state(self) -> int:
+        try:
+            if self.path is None:
+                directory = self._directory or get_user_directory()
+                self.path = os.path.join(directory, f"tenable-rate-limit-{self._digest}")
+            return os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+        except OSError as e:
+            raise TenableAPIError(
+                f"The rate limit state file {self.path or self._directory} can not be used, "
+                f"set TENABLE_RATE_LIMIT_DIR to a writable directory: {e}"
+            )
+
+    def _take(self) -> float:
+        """Takes a token when one is available, otherwise returns the seconds until the next one."""
+        with self._lock:
+            fd = self._open_state()
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                now = time.time()
+                raw = os.pread(fd, STATE_SIZE, 0)
+                if len(raw) == STATE_SIZE:
+                    tokens, updated = struct.unpack(STATE_FORMAT, raw)
+                    tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate)
+                else:
+                    tokens = self.burst
+
+                wait = 0.0
+                if tokens >= 1:
+                    tokens -= 1
+                else:
+                    wait = (1 - tokens) / self.rate
+                os.pwrite(fd, struct.pack(STATE_FORMAT, tokens, now), 0)
+                return wait
+            finally:
+                os.close(fd)
+
+    def acquire(self) -> float:
+        """Blocks until a request can be sent, returns the seconds waited."""
+        waited = 0.0
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+
+
+def get_rate_limiter(access_key: str, rate: float = None, burst: float = None):
+    """Returns the limiter of the API key, or None when no rate limit is configured."""
+    if rate is None:
+        rate = os.getenv("TENABLE_RATE_LIMIT")
+    if burst is None:
+        burst = os.getenv("TENABLE_RATE_LIMIT_BURST")
+    if not rate:
+        return None
+    return RateLimiter(float(rate), burst=float(burst) if burst else None, key=access_key)
@@ -0,0 +1,161 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+from .user_dir import get_user_directory
+
+DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+
+# near static endpoints and the seconds their responses are kept
+CACHE_TTLS = (
+    (re.compile(r"^filters/"), 3600),
+    (re.compile(r"^tags/assets/filters$"), 3600),
+    (re.compile(r"^editor/[^/]+/templates$"), 86400),
+    (re.compile(r"^scans/timezones$"), 86400),
+    (re.compile(r"^credentials/types$"), 86400),
+    (re.compile(r"^plugins/families$"), 3600),
+)
+
+
+def canonical_hash(value):
+    """Returns a hash of the value that does not depend on the order of its dict keys."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def get_cache_ttl(endpoint):
+    """Returns the seconds responses of the endpoint are kept, None when the endpoint is not cacheable."""
+    path = urlsplit(endpoint).path
+    for pattern, ttl in CACHE_TTLS:
+        if pattern.match(path):
+            return ttl
+    return None
+
+
+class ResponseCache:
+    """On-disk cache of API responses kept in SQLite, shared by every fork of the controller.
+
+    Entries are keyed by the API key, the method and the URL with its query in canonical order.
+    Once the cache grows over max_size bytes, the least recently used entries are evicted. Caches with
+    a different name live in their own file, so their size and eviction are independent. The file
+    defaults to a directory private to the user. Creating a cache raises sqlite3.Error or OSError when
+    the file can not be used, once created a cache that can not be read or written behaves as a miss,
+    it never fails the request.
+    """
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE, name="tenable-response-cache"):
+        directory = directory or os.getenv("TENABLE_CACHE_DIR") or get_user_directory()
+        self.path = os.path.join(directory, f"{name}.sqlite")
+        self.max_size = max_size
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, expires REAL, accessed REAL, size INTEGER, response TEXT)"
+                )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # created readable by its owner only before sqlite opens it, links are not followed
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW, 0o600))
+        # sqlite locking makes concurrent access from forks safe, writers wait for each other
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def make_key(access_key, method, url):
+        parts = urlsplit(url)
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        account = hashlib.sha256(access_key.encode("utf-8")).hexdigest()
+        raw = f"{account} {method.upper()} {parts.path}?{query}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        now = time.time()
+        conn = None
+        try:
+            conn = self._connect()
+            with conn:
+                row = conn.execute(
+                    "SELECT response FROM responses WHERE key = ? AND expires > ?", (key, now)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except (sqlite3.Error, OSError):
+            return None
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def set(self, key, response, ttl):
+        now = time.time()
+        serialized = json.dumps(response)
+        size = len(serialized)
+        if size > self.max_size:
+            return
+        conn = None
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM responses WHERE expires <= ?", (now,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires, accessed, size, response) VALUES (?, ?, ?, ?, ?)",
+                    (key, now + ttl, now, size, serialized),
+                )
+                total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_size:
+                    evicted = []
+                    for old_key, old_size in conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+                        if total <= self.max_size:
+                            break
+                        evicted.append((old_key,))
+                        total -= old_size
+                    conn.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        except (sqlite3.Error, OSError):
+            pass
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM responses")
+        finally:
+            conn.close()
+
+
+def get_response_cache(enabled=None, directory=None, max_size=None, name="tenable-response-cache"):
+    """Returns the response cache when enabled, either explicitly or with TENABLE_RESPONSE_CACHE.
+
+    Returns None as well when the cache file can not be used, requests then go to the API.
+    """
+    if enabled is None:
+        enabled = os.getenv("TENABLE_RESPONSE_CACHE", "").lower() in ("1", "true", "yes", "on")
+    if not enabled:
+        return None
+    if max_size is None:
+        max_size = int(os.getenv("TENABLE_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE))
+    try:
+        return ResponseCache(directory=directory, max_size=max_size, name=name)
+    except (sqlite3.Error, OSError):
+        return None
@@ -1,7 +1,16 @@
 from .api import TenableAPI
+from .api import get_pagination
 from .exceptions import TenableAPIError
 
 
+def build_nested_response(data_key: str, items: list) -> dict:
+    """Places the items under the dotted data_key, the same place a single page response has them."""
+    data = items
+    for key in reversed(data_key.split(".")):
+        data = {key: data}
+    return data
+
+
 def run_module(
     module, endpoint: str, param: str = None, method: str = None, data: dict = None, query_params_func=None, **kwargs
 ):
@@ -13,20 +22,24 @@ def run_module(
     if query_params_func:
         query_params = query_params_func(**kwargs)
     try:
-        if method in ["POST", "PUT", "DELETE", "PATCH"]:
+        if module.params.get("fetch_all") and method in [None, "GET"]:
+            data_key = get_pagination(endpoint)["data_key"]
+            items = list(tenable_api.paginate(endpoint, params=query_params))
+            response = {"status_code": 200, "data": build_nested_response(data_key, items)}
+        elif method in ["POST", "PUT", "DELETE", "PATCH"]:
             changed = True
             response = tenable_api.request(method, endpoint, params=query_params, data=data)
         else:
             response = tenable_api.request(method, endpoint, params=query_params)
-        module.exit_json(changed=changed, api_response=response)
+        module.exit_json(changed=changed, api_response=response, retries=tenable_api.retries)
     except TenableAPIError as e:
-        module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"))
+        module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"), retries=tenable_api.retries)
 
 
 def run_module_with_file(module, endpoint: str, file_path: str):
     tenable_api = TenableAPI(module)
     try:
         response = tenable_api.upload_file(endpoint, file_path)
-        module.exit_json(changed=True, api_response=response)
+        module.exit_json(changed=True, api_response=response, retries=tenable_api.retries)
     except TenableAPIError as e:
-        module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"))
+        module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"), retries=tenable_api.retries)
@@ -0,0 +1,290 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+import base64
+import http.client
+import os
+import socket
+import ssl
+import threading
+import time
+import uuid
+from collections import deque
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+from urllib.request import getproxies
+from urllib.request import proxy_bypass
+
+from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six.moves.urllib.error import URLError
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_IDLE_TIMEOUT = 60
+DEFAULT_TIMEOUT = 30
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# errors raised when the server silently closed an idle keep-alive connection
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+
+class MultipartFileEncoder:
+    """File-like multipart/form-data body that streams a single file in chunks.
+
+    The length is known up front so the body is sent with a Content-Length header, and seek(0)
+    rewinds it so a rejected request can be sent again.
+    """
+
+    def __init__(self, field_name, file_path, content_type="application/octet-stream", boundary=None):
+        self.boundary = boundary or f"----TenableFormBoundary{uuid.uuid4().hex}"
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        file_name = os.path.basename(file_path)
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self._file = open(file_path, "rb")
+        self.content_length = len(self._head) + os.fstat(self._file.fileno()).st_size + len(self._tail)
+        self.seek(0)
+
+    def seek(self, offset, whence=0):
+        if offset != 0 or whence != 0:
+            raise ValueError("The multipart body can only be rewound to its start.")
+        self._file.seek(0)
+        self._parts = [self._head, self._file, self._tail]
+        return 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = UPLOAD_CHUNK_SIZE
+        chunks = []
+        while self._parts and size > 0:
+            part = self._parts[0]
+            if isinstance(part, bytes):
+                chunk, self._parts[0] = part[:size], part[size:]
+                if not self._parts[0]:
+                    self._parts.pop(0)
+            else:
+                chunk = part.read(size)
+                if len(chunk) < size:
+                    self._parts.pop(0)
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PooledResponse:
+    """Response returned by ConnectionPool.open, gives the connection back to the pool once fully read."""
+
+    def __init__(self, pool, key, conn, response, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.headers = response.headers
+        self.status = response.status
+        self.reason = response.reason
+
+    def getcode(self):
+        return self.status
+
+    def getheader(self, name, default=None):
+        return self._response.getheader(name, default)
+
+    def read(self, amt=None):
+        data = self._response.read(amt)
+        if self._response.isclosed():
+            self._release()
+        return data
+
+    def close(self):
+        if self._conn is None:
+            return
+        if self._response.isclosed():
+            self._release()
+        else:
+            # unread data is left on the socket, it can not be reused
+            self._response.close()
+            self._pool.discard(self._conn)
+            self._conn = None
+
+    def _release(self):
+        if self._conn is None:
+            return
+        if self._response.will_close:
+            self._pool.discard(self._conn)
+        else:
+            self._pool.release(self._key, self._conn)
+        self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ConnectionPool:
+    """Thread safe pool of keep-alive HTTP(S) connections, reused across requests to the same host."""
+
+    def __init__(
+        self,
+        pool_size=DEFAULT_POOL_SIZE,
+        idle_timeout=DEFAULT_IDLE_TIMEOUT,
+        timeout=DEFAULT_TIMEOUT,
+        validate_certs=True,
+    ):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.validate_certs = validate_certs
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._pid = os.getpid()
+        self._ssl_context = None
+
+    def _get_ssl_context(self):
+        if self._ssl_context is None:
+            if self.validate_certs:
+                self._ssl_context = ssl.create_default_context()
+            else:
+                self._ssl_context = ssl._create_unverified_context()
+        return self._ssl_context
+
+    def _new_connection(self, scheme, host, port):
+        proxy = getproxies().get(scheme)
+        if proxy and proxy_bypass(host):
+            proxy = None
+
+        if proxy:
+            parts = urlsplit(proxy if "://" in proxy else f"http://{proxy}")
+            conn_host, conn_port = parts.hostname, parts.port or 8080
+        else:
+            conn_host, conn_port = host, port
+
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                conn_host, conn_port, timeout=self.timeout, context=self._get_ssl_context()
+            )
+        else:
+            conn = http.client.HTTPConnection(conn_host, conn_port, timeout=self.timeout)
+
+        if proxy:
+            tunnel_headers = {}
+            if parts.username:
+                credentials = f"{unquote(parts.username)}:{unquote(parts.password or '')}".encode("utf-8")
+                tunnel_headers["Proxy-Authorization"] = f"Basic {base64.b64encode(credentials).decode('ascii')}"
+            conn.set_tunnel(host, port, headers=tunnel_headers)
+        return conn
+
+    def _get_connection(self, key):
+        now = time.monotonic()
+        with self._lock:
+            if os.getpid() != self._pid:
+                # sockets inherited from the parent process are never shared with it
+                self._idle = {}
+                self._pid = os.getpid()
+            idle = self._idle.get(key)
+            while idle:
+                conn, last_used = idle.pop()
+                if now - last_used < self.idle_timeout:
+                    return conn, True
+                conn.close()
+        return self._new_connection(*key), False
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, deque())
+            if len(idle) < self.pool_size and os.getpid() == self._pid:
+                idle.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def discard(self, conn):
+        conn.close()
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, unused_last_used in connections:
+                conn.close()
+
+    def open(self, method, url, headers=None, data=None):
+        """Sends a request reusing an idle connection when possible, mirroring ansible.module_utils.urls.Request.open.
+
+        Raises HTTPError for error status codes and URLError when the connection can not be made.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        # a stream body can only be sent again when it can be rewound
+        can_resend = data is None or isinstance(data, bytes) or hasattr(data, "seek")
+        while True:
+            conn, reused = self._get_connection(key)
+            try:
+                if hasattr(data, "seek"):
+                    data.seek(0)
+                conn.request(method, path, body=data, headers=headers or {})
+                response = conn.getresponse()
+                break
+            except STALE_CONNECTION_ERRORS as e:
+                conn.close()
+                if reused and can_resend:
+                    continue
+                raise URLError(e)
+            except (http.client.HTTPException, ssl.SSLError, ConnectionError) as e:
+                conn.close()
+                raise URLError(e)
+            except OSError as e:
+                conn.close()
+                if isinstance(e, (TimeoutError, socket.timeout)):
+                    raise TimeoutError(str(e))
+                raise URLError(e)
+
+        pooled = PooledResponse(self, key, conn, response, url)
+        if response.status >= 400:
+            raise HTTPError(url, response.status, response.reason, response.headers, pooled)
+        return pooled
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(pool_size=None, idle_timeout=None, timeout=DEFAULT_TIMEOUT, validate_certs=True):
+    """Returns the process wide pool for the given settings so every client in the process shares connections."""
+    if pool_size is None:
+        pool_size = int(os.getenv("TENABLE_POOL_SIZE", DEFAULT_POOL_SIZE))
+    if idle_timeout is None:
+        idle_timeout = float(os.getenv("TENABLE_POOL_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+
+    key = (pool_size, idle_timeout, timeout, validate_certs)
+    with _POOLS_LOCK:
+        if key not in _POOLS:
+            _POOLS[key] = ConnectionPool(
+                pool_size=pool_size, idle_timeout=idle_timeout, timeout=timeout, validate_certs=validate_certs
+            )
+        return _POOLS[key]
@@ -0,0 +1,28 @@
+# (c) 2024, Fernando Mendieta (fernandomendietaovejero@gmail.com)
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+__metaclass__ = type
+
+import os
+import stat
+import tempfile
+
+
+def get_user_directory():
+    """Returns a directory of the temporary directory only the current user can access, created when missing.
+
+    Raises OSError when the path exists but is a link, is not a directory or is open to other users.
+    """
+    path = os.path.join(tempfile.gettempdir(), f"tenable-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise OSError(f"{path} is not a private directory of the current user.")
+    return path
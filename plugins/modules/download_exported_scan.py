@@ -32,6 +32,8 @@ options:
   download_path:
     description:
       - The path where the downloaded exported scan should be saved and the name.
+      - The scan is streamed to a temporary file next to it and renamed once complete.
+      - A download interrupted in a previous run is resumed from the bytes already written.
     required: true
     type: str
 author:
@@ -57,6 +59,41 @@ EXAMPLES = r"""
 """
 
 RETURN = r"""
+path:
+  description: The path where the downloaded exported scan is saved.
+  returned: always
+  type: str
+  sample: "/tmp/descarga.csv"
+size:
+  description: The size of the downloaded exported scan in bytes.
+  returned: always
+  type: int
+  sample: 46938
+msg:
+  description: A message indicating the status of the download.
+  returned: always
+  type: str
+  sample: "Scan downloaded successfully"
+elapsed:
+  description: Seconds the download took.
+  returned: always
+  type: float
+  sample: 1.52
+bytes_per_second:
+  description: Average transfer rate of the bytes downloaded in this run.
+  returned: always
+  type: int
+  sample: 30880
+resumed_from:
+  description: Bytes of a previous interrupted download the transfer was resumed from, 0 when it started from scratch.
+  returned: always
+  type: int
+  sample: 0
+retries:
+  description: Number of retries made because of rate limits, unavailable responses or interrupted transfers.
+  returned: always
+  type: int
+  sample: 0
 """
 
 
@@ -89,13 +126,18 @@ def main():
 
     try:
         tenable_api = TenableAPI(module)
-        tenable_api.headers["Accept"] = "application/octet-stream"
-        response = tenable_api.request("GET", endpoint)
-
-        with open(download_path, "wb") as f:
-            f.write(response["data"])
-
-        module.exit_json(changed=True, msg="Scan downloaded successfully", path=download_path)
+        result = tenable_api.download(endpoint, download_path, accept="application/octet-stream")
+
+        module.exit_json(
+            changed=True,
+            msg="Scan downloaded successfully",
+            path=download_path,
+            size=result["size"],
+            elapsed=result["elapsed"],
+            bytes_per_second=result["bytes_per_second"],
+            resumed_from=result["resumed_from"],
+            retries=tenable_api.retries,
+        )
     except TenableAPIError as e:
         module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"))
     except Exception as e:
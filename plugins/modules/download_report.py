@@ -26,6 +26,8 @@ options:
   download_path:
     description:
       - The path where the downloaded PDF report should be saved and the name.
+      - The report is streamed to a temporary file next to it and renamed once complete.
+      - A download interrupted in a previous run is resumed from the bytes already written.
     required: true
     type: str
 author:
@@ -50,6 +52,26 @@ msg:
   returned: always
   type: str
   sample: "Report downloaded successfully"
+elapsed:
+  description: Seconds the download took.
+  returned: always
+  type: float
+  sample: 1.52
+bytes_per_second:
+  description: Average transfer rate of the bytes downloaded in this run.
+  returned: always
+  type: int
+  sample: 30880
+resumed_from:
+  description: Bytes of a previous interrupted download the transfer was resumed from, 0 when it started from scratch.
+  returned: always
+  type: int
+  sample: 0
+retries:
+  description: Number of retries made because of rate limits, unavailable responses or interrupted transfers.
+  returned: always
+  type: int
+  sample: 0
 """
 
 EXAMPLES = r"""
@@ -94,13 +116,18 @@ def main():
 
     try:
         tenable_api = TenableAPI(module)
-        tenable_api.headers["Accept"] = "application/pdf"
-        response = tenable_api.request("GET", endpoint)
-
-        with open(download_path, "wb") as f:
-            f.write(response["data"])
-
-        module.exit_json(changed=True, msg="Report downloaded successfully", path=download_path)
+        result = tenable_api.download(endpoint, download_path, accept="application/pdf")
+
+        module.exit_json(
+            changed=True,
+            msg="Report downloaded successfully",
+            path=download_path,
+            size=result["size"],
+            elapsed=result["elapsed"],
+            bytes_per_second=result["bytes_per_second"],
+            resumed_from=result["resumed_from"],
+            retries=tenable_api.retries,
+        )
     except TenableAPIError as e:
         module.fail_json(msg=str(e), status_code=getattr(e, "status_code", "Unknown"))
     except Exception as e:
@@ -20,6 +20,7 @@ author:
   - Fernando Mendieta Ovejero (@valkiriaaquatica)
 extends_documentation_fragment:
   - valkiriaaquatica.tenable.credentials
+  - valkiriaaquatica.tenable.response_cache
 """
 
 EXAMPLES = r"""
@@ -30,6 +31,10 @@ EXAMPLES = r"""
 - name: List all available time zones in Tenable using envirometn credentials
   get_timezones:
   register: all_timezones
+- name: List the time zones once a day, every host reads them from the cache
+  get_timezones:
+    use_cache: true
+  register: all_timezones
 """
 
 RETURN = r"""
@@ -63,7 +68,7 @@ from ansible.module_utils.basic import AnsibleModule
 
 
 def main():
-    argument_spec = get_spec("access_key", "secret_key")
+    argument_spec = get_spec("access_key", "secret_key", "use_cache", "cache_ttl")
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
     run_module(module, "scans/timezones", method="GET")
 
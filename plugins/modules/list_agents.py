@@ -25,6 +25,7 @@ extends_documentation_fragment:
   - valkiriaaquatica.tenable.generics
   - valkiriaaquatica.tenable.filters_wildcards
   - valkiriaaquatica.tenable.filter_type
+  - valkiriaaquatica.tenable.fetch_all
 """
 
 EXAMPLES = r"""
@@ -45,6 +46,14 @@ EXAMPLES = r"""
 - name: List all agents using enviroment credentials
   list_agents:
 
+- name: List every linux agent walking all the pages
+  list_agents:
+    fetch_all: true
+    filters:
+      - type: platform
+        operator: eq
+        value: LINUX
+
 
 - name: List all agents
   list_agents:
@@ -261,6 +270,7 @@ def main():
         "limit",
         "offset",
         "sort",
+        "fetch_all",
     )
     module = AnsibleModule(argument_spec=common_spec, supports_check_mode=False)
 
@@ -31,6 +31,7 @@ extends_documentation_fragment:
   - valkiriaaquatica.tenable.generics
   - valkiriaaquatica.tenable.filters_wildcards
   - valkiriaaquatica.tenable.filter_type
+  - valkiriaaquatica.tenable.fetch_all
 """
 
 EXAMPLES = r"""
@@ -42,6 +43,11 @@ EXAMPLES = r"""
         operator: match
         value: "10.6.2"
 
+- name: List every agent of a group walking all the pages
+  list_agents_by_group:
+    agent_group_id: 123456
+    fetch_all: true
+
 - name: List agents by group with variables
   list_agents_by_group:
     access_key: "your_access_key"
@@ -249,6 +255,7 @@ def main():
         "limit",
         "offset",
         "sort",
+        "fetch_all",
     )
     special_args = {
         "agent_group_id": {
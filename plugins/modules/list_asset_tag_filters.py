@@ -22,6 +22,7 @@ author:
   - Fernando Mendieta Ovejero (@valkiriaaquatica)
 extends_documentation_fragment:
   - valkiriaaquatica.tenable.credentials
+  - valkiriaaquatica.tenable.response_cache
 """
 
 EXAMPLES = r"""
@@ -102,7 +103,7 @@ from ansible.module_utils.basic import AnsibleModule
 
 
 def main():
-    argument_spec = get_spec("access_key", "secret_key")
+    argument_spec = get_spec("access_key", "secret_key", "use_cache", "cache_ttl")
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
 
     endpoint = "tags/assets/filters"
@@ -28,6 +28,7 @@ author:
   - Fernando Mendieta Ovejero (@valkiriaaquatica)
 extends_documentation_fragment:
   - valkiriaaquatica.tenable.credentials
+  - valkiriaaquatica.tenable.response_cache
 """
 
 EXAMPLES = r"""
@@ -87,7 +88,7 @@ from ansible.module_utils.basic import AnsibleModule
 
 
 def main():
-    common_spec = get_spec("access_key", "secret_key")
+    common_spec = get_spec("access_key", "secret_key", "use_cache", "cache_ttl")
     special_args = {"all": {"required": True, "type": "bool"}}  # unique for this module
     argument_spec = {**common_spec, **special_args}
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=False)
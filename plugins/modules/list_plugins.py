@@ -43,6 +43,7 @@ author:
   - Fernando Mendieta Ovejero (@valkiriaaquatica)
 extends_documentation_fragment:
   - valkiriaaquatica.tenable.credentials
+  - valkiriaaquatica.tenable.fetch_all
 """
 
 EXAMPLES = r"""
@@ -55,6 +56,12 @@ EXAMPLES = r"""
   list_plugins:
     size: 1
 
+- name: List every plugin updated since a date walking pages of 5000 records
+  list_plugins:
+    last_updated: "2024-01-01"
+    size: 5000
+    fetch_all: true
+
 - name: List four record plugins specifying page using enviorent credentials
   list_plugins:
     size: 4
@@ -298,7 +305,7 @@ def main():
     # last_updated is unique in this module
     # size is unique for this module
     # page is unique for this module
-    common_spec = get_spec("access_key", "secret_key", "last_updated", "size", "page")
+    common_spec = get_spec("access_key", "secret_key", "last_updated", "size", "page", "fetch_all")
 
     module = AnsibleModule(argument_spec=common_spec, supports_check_mode=False)
 
@@ -26,6 +26,7 @@ options:
     description:
       - The file to upload.
       - The route of the file.
+      - The file is streamed from disk, so large target or credential files of any type, binaries included, can be uploaded.
     required: true
     type: str
 author:
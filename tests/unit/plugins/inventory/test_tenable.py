@@ -1,8 +1,15 @@
+import json
+import threading
+import time
+import tracemalloc
 from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 
+from ansible.errors import AnsibleError
+from ansible.errors import AnsibleParserError
+
 mock_assets = [
     {
         "id": "asset1",
@@ -32,7 +39,7 @@ def inventory_module():
 @patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.InventoryModule.fetch_assets")
 def test_parse(mock_fetch_assets, mock_init_api, inventory_module):
     """Test the parse function of the InventoryModule."""
-    mock_api_client = MagicMock()
+    mock_api_client = MagicMock(requests_sent=1, retries=0, bytes_received=100)
     mock_init_api.return_value = mock_api_client
     mock_fetch_assets.return_value = mock_assets
 
@@ -49,12 +56,19 @@ def test_parse(mock_fetch_assets, mock_init_api, inventory_module):
             "filter_search_type": "",
             "all_fields": "",
             "full_info": False,
+            "source": "assets",
+            "asset_source": "workbench",
             "date_range": 30,
             "hostname_sources": ["hostname", "fqdn", "agent_name"],
             "hostname_prefix": "",
             "hostname_suffix": "",
             "hostname_separator": "",
+            "hostvars_fields": [],
+            "exclude_fields": [],
+            "tag_groups": [],
+            "field_groups": [],
             "cache": False,
+            "stats_file": None,
             "groups": {},
             "compose": {},
             "keyed_groups": {},
@@ -72,7 +86,7 @@ def test_parse(mock_fetch_assets, mock_init_api, inventory_module):
 @patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.InventoryModule.fetch_asset_details")
 def test_full_info(mock_fetch_asset_details, mock_fetch_assets, mock_init_api, inventory_module):
     """Test full information fetching for assets."""
-    mock_api_client = MagicMock()
+    mock_api_client = MagicMock(requests_sent=1, retries=0, bytes_received=100)
     mock_init_api.return_value = mock_api_client
     mock_fetch_assets.return_value = mock_assets
 
@@ -94,12 +108,21 @@ def test_full_info(mock_fetch_asset_details, mock_fetch_assets, mock_init_api, i
             "filter_search_type": "",
             "all_fields": "",
             "full_info": True,
+            "full_info_concurrency": 10,
+            "source": "assets",
+            "asset_source": "workbench",
+            "asset_details_cache": False,
             "date_range": 30,
             "hostname_sources": ["hostname", "fqdn", "agent_name"],
             "hostname_prefix": "",
             "hostname_suffix": "",
             "hostname_separator": "",
+            "hostvars_fields": [],
+            "exclude_fields": [],
+            "tag_groups": [],
+            "field_groups": [],
             "cache": False,
+            "stats_file": None,
             "groups": {},
             "compose": {},
             "keyed_groups": {},
@@ -112,3 +135,649 @@ def test_full_info(mock_fetch_asset_details, mock_fetch_assets, mock_init_api, i
     mock_init_api.assert_called_once_with(access_key="test_access_key", secret_key="test_secret_key")
     mock_fetch_assets.assert_called_once()
     assert mock_fetch_asset_details.call_count == len(mock_assets)
+
+
+def test_full_info_fetched_concurrently_in_order(inventory_module):
+    """Asset details are fetched by several workers and hosts are still added in the order of the assets."""
+    assets = [{"id": f"asset{idx}", "hostname": f"host{idx}.example.com"} for idx in range(20)]
+    lock = threading.Lock()
+    running = {"now": 0, "max": 0}
+
+    def fetch_asset_details(api_client, asset_id):
+        with lock:
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+        time.sleep(0.01)
+        with lock:
+            running["now"] -= 1
+        return {"id": asset_id, "hostname": f"{asset_id}.details.example.com"}
+
+    inventory_module.inventory = MagicMock()
+    inventory_module.fetch_asset_details = fetch_asset_details
+    inventory_module._set_composite_vars = MagicMock()
+    inventory_module._add_host_to_composed_groups = MagicMock()
+    inventory_module._add_host_to_keyed_groups = MagicMock()
+    inventory_module.get_option = MagicMock(
+        side_effect=lambda key, default=None: {
+            "full_info_concurrency": 4,
+            "hostname_sources": ["hostname"],
+            "hostname_prefix": "",
+            "hostname_suffix": "",
+            "hostname_separator": "",
+            "hostvars_fields": [],
+            "exclude_fields": [],
+            "tag_groups": [],
+            "field_groups": [],
+            "groups": {},
+            "compose": {},
+            "keyed_groups": {},
+            "strict": False,
+        }[key]
+    )
+
+    inventory_module.populate_inventory(assets, MagicMock(), True)
+
+    added = [call.args[0] for call in inventory_module.inventory.add_host.call_args_list]
+    assert added == [f"asset{idx}.details.example.com" for idx in range(20)]
+    assert 1 < running["max"] <= 4
+
+
+EXPORT_OPTIONS = {
+    "export_concurrency": 2,
+    "export_chunk_size": 100,
+    "export_filters": {"updated_at": 1704067200},
+    "export_poll_interval": 5,
+    "export_timeout": 3600,
+    "hostname_sources": ["hostname", "id"],
+    "hostname_prefix": "",
+    "hostname_suffix": "",
+    "hostname_separator": "",
+    "hostvars_fields": [],
+    "exclude_fields": [],
+    "tag_groups": [],
+    "field_groups": [],
+    "groups": {},
+    "compose": {},
+    "keyed_groups": {},
+    "strict": False,
+}
+
+
+def export_api(statuses, chunks):
+    """Returns a client answering the export calls, statuses are returned one per status check"""
+    api_client = MagicMock()
+    statuses = iter(statuses)
+
+    def request(method, endpoint, params=None, data=None, headers=None):
+        if endpoint == "assets/export":
+            assert data == {"chunk_size": 100, "filters": {"updated_at": 1704067200}}
+            return {"status_code": 200, "data": {"export_uuid": "uuid"}}
+        if endpoint == "assets/export/uuid/status":
+            return {"status_code": 200, "data": next(statuses)}
+        chunk_id = int(endpoint.rsplit("/", 1)[1])
+        return {"status_code": 200, "data": chunks[chunk_id]}
+
+    api_client.request.side_effect = request
+    return api_client
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.time.sleep")
+def test_export_assets_streamed_in_chunk_order(mock_sleep, inventory_module):
+    """Chunks are downloaded as the export makes them available and their assets added in order."""
+    chunks = {
+        idx: [{"id": f"asset{idx}-{pos}", "hostnames": [f"host{idx}-{pos}"]} for pos in range(3)] for idx in range(1, 6)
+    }
+    api_client = export_api(
+        [
+            {"status": "PROCESSING", "chunks_available": []},
+            {"status": "PROCESSING", "chunks_available": [1, 2]},
+            {"status": "FINISHED", "chunks_available": [1, 2, 3, 4, 5]},
+        ],
+        chunks,
+    )
+    inventory_module.inventory = MagicMock()
+    inventory_module._set_composite_vars = MagicMock()
+    inventory_module._add_host_to_composed_groups = MagicMock()
+    inventory_module._add_host_to_keyed_groups = MagicMock()
+    inventory_module.get_option = MagicMock(side_effect=lambda key, default=None: EXPORT_OPTIONS[key])
+
+    inventory_module.populate_inventory(inventory_module.fetch_exported_assets(api_client), api_client, False)
+
+    added = [call.args[0] for call in inventory_module.inventory.add_host.call_args_list]
+    assert added == [f"host{idx}-{pos}" for idx in range(1, 6) for pos in range(3)]
+    mock_sleep.assert_called_once_with(5)
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.time.sleep")
+def test_export_assets_failed_export(mock_sleep, inventory_module):
+    """An export ending in error fails the inventory instead of leaving it silently incomplete."""
+    api_client = export_api([{"status": "ERROR", "chunks_available": []}], {})
+    inventory_module.get_option = MagicMock(side_effect=lambda key, default=None: EXPORT_OPTIONS[key])
+
+    with pytest.raises(AnsibleError, match="ended with status ERROR"):
+        list(inventory_module.fetch_exported_assets(api_client))
+
+
+def inventory_cache():
+    """Returns the cache Ansible gives inventory plugins, backed by the memory cache plugin"""
+    from ansible.plugins.cache import CachePluginAdjudicator
+
+    return CachePluginAdjudicator("memory")
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.init_tenable_api")
+def test_exported_assets_cached_between_parses(mock_init_api, mock_sleep, inventory_module):
+    """The exported assets are cached by the first parse and read back by the next one."""
+    from ansible.inventory.data import InventoryData
+
+    chunks = {1: [{"id": "asset1", "hostnames": ["host1"]}, {"id": "asset2", "hostnames": ["host2"]}]}
+    api_client = export_api([{"status": "FINISHED", "chunks_available": [1]}], chunks)
+    api_client.configure_mock(access_key="test_access_key", requests_sent=3, retries=0, bytes_received=100)
+    mock_init_api.return_value = api_client
+    options = {
+        **EXPORT_OPTIONS,
+        "access_key": "test_access_key",
+        "secret_key": "test_secret_key",
+        "include_filters": [],
+        "filter_search_type": "",
+        "all_fields": "",
+        "full_info": False,
+        "source": "assets",
+        "asset_source": "export",
+        "date_range": 30,
+        "cache": True,
+        "incremental": False,
+        "stats_file": None,
+    }
+    inventory_module._read_config_data = MagicMock()
+    inventory_module.get_option = lambda key, default=None: options[key]
+    inventory_module._cache = inventory_cache()
+
+    inventory_module.parse(InventoryData(), MagicMock(), "test_path")
+    requests_sent = api_client.request.call_count
+    inventory = InventoryData()
+    inventory_module.parse(inventory, MagicMock(), "test_path")
+
+    assert api_client.request.call_count == requests_sent
+    assert set(inventory.hosts) == {"host1", "host2"}
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.init_tenable_api")
+def test_workbench_assets_cached_between_parses(mock_init_api, inventory_module):
+    """The workbench assets are cached by the first parse and read back by the next one."""
+    from ansible.inventory.data import InventoryData
+
+    api_client = MagicMock(access_key="test_access_key", requests_sent=1, retries=0, bytes_received=100)
+    api_client.request.return_value = {"status_code": 200, "data": {"assets": mock_assets}}
+    mock_init_api.return_value = api_client
+    options = {
+        **EXPORT_OPTIONS,
+        "access_key": "test_access_key",
+        "secret_key": "test_secret_key",
+        "include_filters": [],
+        "filter_search_type": "",
+        "all_fields": "",
+        "full_info": False,
+        "source": "assets",
+        "asset_source": "workbench",
+        "date_range": 30,
+        "cache": True,
+        "stats_file": None,
+    }
+    inventory_module._read_config_data = MagicMock()
+    inventory_module.get_option = lambda key, default=None: options[key]
+    inventory_module._cache = inventory_cache()
+
+    inventory_module.parse(InventoryData(), MagicMock(), "test_path")
+    inventory = InventoryData()
+    inventory_module.parse(inventory, MagicMock(), "test_path")
+
+    api_client.request.assert_called_once()
+    assert set(inventory.hosts) == {"host1.example.com", "host2.example.com"}
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.time.time", return_value=2000)
+def test_incremental_sync_exports_every_asset_first(mock_time, inventory_module):
+    """Without synced assets cached every asset is exported and cached with the sync time."""
+    inventory_module._cache = inventory_cache()
+    inventory_module.fetch_exported_assets = MagicMock(return_value=iter([{"id": "a"}, {"id": "b"}]))
+
+    resources = inventory_module.sync_exported_assets(MagicMock(), "key")
+
+    assert resources == [{"id": "a"}, {"id": "b"}]
+    assert inventory_module._cache["key"] == {"watermark": 2000, "assets": resources}
+    inventory_module.fetch_exported_assets.assert_called_once()
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.time.time", return_value=2000)
+def test_incremental_sync_merges_changes(mock_time, inventory_module):
+    """Only assets changed since the watermark are exported and merged into the cached ones."""
+    inventory_module._cache = inventory_cache()
+    inventory_module._cache["key"] = {
+        "watermark": 1000,
+        "assets": [{"id": "a", "v": 1}, {"id": "b", "v": 1}, {"id": "c", "v": 1}],
+    }
+    exports = {
+        "updated_at": [{"id": "a", "v": 2}, {"id": "c", "v": 2, "deleted_at": "2024-01-01"}, {"id": "d", "v": 1}],
+        "deleted_at": [{"id": "b"}],
+    }
+    inventory_module.fetch_exported_assets = MagicMock(
+        side_effect=lambda api_client, filters: iter(exports[next(iter(filters))])
+    )
+
+    resources = inventory_module.sync_exported_assets(MagicMock(), "key")
+
+    assert resources == [{"id": "a", "v": 2}, {"id": "d", "v": 1}]
+    assert inventory_module._cache["key"]["watermark"] == 2000
+    assert [call.args[1] for call in inventory_module.fetch_exported_assets.call_args_list] == [
+        {"updated_at": 1000},
+        {"deleted_at": 1000},
+    ]
+
+
+def test_asset_details_fetched_ahead_are_bounded(inventory_module):
+    """Only concurrency details are fetched ahead of the host being added."""
+    fetched = []
+    inventory_module.fetch_cached_asset_details = lambda api_client, asset: fetched.append(asset["id"]) or asset
+
+    details = inventory_module.iter_asset_details(MagicMock(), ({"id": idx} for idx in range(1000)), 3)
+    assert next(details) == {"id": 0}
+    time.sleep(0.05)
+
+    assert len(fetched) <= 4
+    assert [asset["id"] for asset in details] == list(range(1, 1000))
+
+
+def test_asset_details_cache(inventory_module, tmp_path):
+    """Details are fetched again only for assets updated since they were cached."""
+    from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import ResponseCache
+
+    inventory_module._details_cache = ResponseCache(directory=str(tmp_path), name="tenable-asset-details")
+    inventory_module.get_option = MagicMock(side_effect=lambda key, default=None: {"asset_details_cache_ttl": 60}[key])
+    inventory_module.fetch_asset_details = MagicMock(side_effect=lambda api_client, asset_id: {"id": asset_id})
+    api_client = MagicMock(access_key="test_access_key")
+    assets = [{"id": "a", "updated_at": "2024-01-01"}, {"id": "b", "updated_at": "2024-01-01"}, {"id": "c"}]
+
+    list(inventory_module.iter_asset_details(api_client, assets, 2))
+    assets[1]["updated_at"] = "2024-02-01"
+    details = list(inventory_module.iter_asset_details(api_client, assets, 2))
+
+    assert details == [{"id": "a"}, {"id": "b"}, {"id": "c"}]
+    fetched = [call.args[1] for call in inventory_module.fetch_asset_details.call_args_list]
+    assert sorted(fetched) == ["a", "b", "b", "c", "c"]
+
+
+def test_query_cache_key(inventory_module):
+    """The cache key changes with the query and the account, not with the order of the query parameters."""
+    inventory_module.get_option = MagicMock(side_effect=lambda key, default=None: {"export_filters": {}}[key])
+    api_client = MagicMock(access_key="test_access_key")
+    query = {"date_range": 30, "filter.0.filter": "ipv4", "filter.0.quality": "eq", "filter.0.value": "10.0.0.1"}
+    key = inventory_module.get_query_cache_key(api_client, "workbench", query)
+
+    assert key.startswith("tenable_")
+    assert key == inventory_module.get_query_cache_key(api_client, "workbench", dict(reversed(list(query.items()))))
+    assert key != inventory_module.get_query_cache_key(api_client, "workbench", {**query, "date_range": 7})
+    assert key != inventory_module.get_query_cache_key(api_client, "export", query)
+    assert key != inventory_module.get_query_cache_key(MagicMock(access_key="other_key"), "workbench", query)
+
+
+class HostvarsInventory:
+    def __init__(self):
+        self.hostvars = {}
+
+    def add_host(self, host_name):
+        self.hostvars[host_name] = {}
+        return host_name
+
+    def set_variable(self, host, key, value):
+        self.hostvars[host][key] = value
+
+
+def synthetic_assets(count):
+    """Yields workbench like assets with all_fields full, values of the extra fields are shared between assets"""
+    extra_fields = {f"field_{pos}": [f"value of field {pos}"] for pos in range(40)}
+    for idx in range(count):
+        yield {
+            "id": f"{idx:08x}-0000-4000-8000-000000000000",
+            "hostname": [f"host{idx}.example.com"],
+            "ipv4": [f"10.{idx >> 16 & 255}.{idx >> 8 & 255}.{idx & 255}"],
+            "operating_system": ["Linux"],
+            **extra_fields,
+        }
+
+
+# 100k assets show the same ratio, about 221 MB full against 75 MB projected, but take seconds to run
+BENCHMARK_ASSETS = 5000
+
+
+def measure_hostvars_memory(inventory_module, fields):
+    options = {
+        "hostname_sources": ["hostname"],
+        "hostname_prefix": "",
+        "hostname_suffix": "",
+        "hostname_separator": "",
+        "hostvars_fields": fields,
+        "exclude_fields": [],
+        "tag_groups": [],
+        "field_groups": [],
+        "groups": {},
+        "compose": {},
+        "keyed_groups": [],
+        "strict": False,
+    }
+    inventory_module.inventory = HostvarsInventory()
+    inventory_module.get_option = lambda key, default=None: options[key]
+
+    tracemalloc.start()
+    try:
+        inventory_module.populate_inventory(synthetic_assets(BENCHMARK_ASSETS), None, False)
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_project_asset():
+    from ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable import project_asset
+
+    asset = {"id": "a", "ipv4": ["10.0.0.1"], "fqdn": [], "tags": [{"key": "value"}]}
+    assert project_asset(asset, [], set()) is asset
+    assert project_asset(asset, ["id", "ipv4", "missing"], set()) == {"id": "a", "ipv4": ["10.0.0.1"]}
+    assert project_asset(asset, [], {"tags", "fqdn"}) == {"id": "a", "ipv4": ["10.0.0.1"]}
+    assert project_asset(asset, ["id", "tags"], {"tags"}) == {"id": "a"}
+
+
+def test_hostvars_fields_memory_benchmark(inventory_module):
+    """Hostvars of assets projected to a few fields take a fraction of the memory of the full assets."""
+    full = measure_hostvars_memory(inventory_module, [])
+    projected = measure_hostvars_memory(inventory_module, ["id", "ipv4", "operating_system"])
+
+    assert len(inventory_module.inventory.hostvars) == BENCHMARK_ASSETS
+    assert projected * 2 < full
+
+
+def test_tag_and_field_groups_without_templating(inventory_module):
+    """Tag and field groups are built from the whole asset without rendering any template."""
+    from ansible.inventory.data import InventoryData
+
+    options = {
+        "hostname_sources": ["hostname"],
+        "hostname_prefix": "",
+        "hostname_suffix": "",
+        "hostname_separator": "",
+        "hostvars_fields": ["id"],
+        "exclude_fields": [],
+        "tag_groups": [
+            {"category": "Cloud Provider", "prefix": "cloud", "parent_group": "clouds"},
+            {"category": "Env"},
+        ],
+        "field_groups": [
+            {"field": "operating_system", "prefix": "os"},
+            {"field": "has_agent", "prefix": "agent", "separator": "_is_"},
+        ],
+        "leading_separator": True,
+        "groups": {},
+        "compose": {},
+        "keyed_groups": [],
+        "strict": False,
+    }
+    assets = [
+        {
+            "id": "a",
+            "hostname": ["host1"],
+            "has_agent": True,
+            "operating_system": ["Linux", "Windows"],
+            "tags": [{"tag_key": "Cloud Provider", "tag_value": "AWS"}, {"tag_key": "Env", "tag_value": "prod"}],
+        },
+        {
+            "id": "b",
+            "hostname": ["host2"],
+            "has_agent": None,
+            "operating_system": [],
+            "tags": [{"key": "Cloud Provider", "value": "AWS"}, {"key": "Cloud Provider", "value": "AZURE"}],
+        },
+    ]
+    inventory_module.inventory = InventoryData()
+    inventory_module.get_option = lambda key, default=None: options[key]
+    inventory_module._compose = MagicMock(side_effect=AssertionError("templates must not be rendered"))
+
+    inventory_module.populate_inventory(assets, None, False)
+
+    groups = {
+        name: sorted(host.name for host in group.hosts) for name, group in inventory_module.inventory.groups.items()
+    }
+    assert groups["cloud_AWS"] == ["host1", "host2"]
+    assert groups["cloud_AZURE"] == ["host2"]
+    assert groups["_prod"] == ["host1"]
+    assert groups["os_Linux"] == ["host1"]
+    assert groups["os_Windows"] == ["host1"]
+    assert groups["agent_is_True"] == ["host1"]
+    assert sorted(child.name for child in inventory_module.inventory.groups["clouds"].child_groups) == [
+        "cloud_AWS",
+        "cloud_AZURE",
+    ]
+    assert inventory_module.inventory.get_host("host2").vars["asset_details"] == {"id": "b"}
+
+
+def test_tag_groups_entry_without_category(inventory_module):
+    inventory_module.get_option = lambda key, default=None: {"tag_groups": [{"prefix": "cloud"}], "field_groups": []}[
+        key
+    ]
+    with pytest.raises(AnsibleParserError, match="with a category"):
+        inventory_module.compile_fast_groups()
+
+
+def paged_api(items, data_key, page_size):
+    """Returns a client answering offset paginated calls over the items"""
+    api_client = MagicMock()
+
+    def request(method, endpoint, params=None, data=None, headers=None):
+        assert params["limit"] == page_size
+        page = items[params["offset"] : params["offset"] + page_size]
+        return {"status_code": 200, "data": {data_key: page, "pagination": {"total": len(items)}}}
+
+    api_client.request.side_effect = request
+    return api_client
+
+
+def test_agents_source(inventory_module):
+    """Agents are read page by page, named after their name and grouped by their agent groups."""
+    from ansible.inventory.data import InventoryData
+
+    agents = [
+        {"id": idx, "uuid": f"uuid{idx}", "name": f"agent{idx}", "groups": [{"id": 1, "name": f"group{idx % 3}"}]}
+        for idx in range(12000)
+    ]
+    api_client = paged_api(agents, "agents", 5000)
+    options = {
+        "page_concurrency": 2,
+        "agent_group_prefix": "agent_group_",
+        "hostname_sources": ["name"],
+        "hostname_prefix": "",
+        "hostname_suffix": "",
+        "hostname_separator": "",
+        "hostvars_fields": [],
+        "exclude_fields": [],
+        "tag_groups": [],
+        "field_groups": [],
+        "groups": {},
+        "compose": {},
+        "keyed_groups": [],
+        "strict": False,
+    }
+    inventory_module.inventory = InventoryData()
+    inventory_module.get_option = lambda key, default=None: options[key]
+
+    items = inventory_module.fetch_paged_items(api_client, "scanners/null/agents")
+    inventory_module.populate_inventory(items, api_client, False, source="agents")
+
+    assert [call.kwargs["params"]["offset"] for call in api_client.request.call_args_list] == [0, 5000, 10000]
+    assert list(inventory_module.inventory.hosts)[:2] == ["agent0", "agent1"]
+    assert len(inventory_module.inventory.hosts) == 12000
+    assert len(inventory_module.inventory.groups["agent_group_group1"].hosts) == 4000
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.init_tenable_api")
+def test_agents_cached_between_parses(mock_init_api, inventory_module):
+    """The agents are cached by the first parse and read back by the next one."""
+    from ansible.inventory.data import InventoryData
+
+    agents = [{"id": f"{idx}", "uuid": f"uuid{idx}", "name": f"agent{idx}", "groups": []} for idx in range(3)]
+    api_client = paged_api(agents, "agents", 5000)
+    api_client.configure_mock(access_key="test_access_key", requests_sent=1, retries=0, bytes_received=100)
+    mock_init_api.return_value = api_client
+    options = {
+        **EXPORT_OPTIONS,
+        "access_key": "test_access_key",
+        "secret_key": "test_secret_key",
+        "include_filters": [],
+        "filter_search_type": "",
+        "all_fields": "",
+        "full_info": False,
+        "source": "agents",
+        "date_range": 30,
+        "hostname_sources": ["name"],
+        "page_concurrency": 2,
+        "agent_group_prefix": "agent_group_",
+        "cache": True,
+        "stats_file": None,
+    }
+    inventory_module._read_config_data = MagicMock()
+    inventory_module.get_option = lambda key, default=None: options[key]
+    inventory_module._cache = inventory_cache()
+
+    inventory_module.parse(InventoryData(), MagicMock(), "test_path")
+    inventory = InventoryData()
+    inventory_module.parse(inventory, MagicMock(), "test_path")
+
+    api_client.request.assert_called_once()
+    assert set(inventory.hosts) == {"agent0", "agent1", "agent2"}
+
+
+def test_networks_source_hostname_fallback(inventory_module):
+    """Networks are named after their name when none of the hostname sources is found."""
+    networks = [{"uuid": "00000000-0000-0000-0000-000000000000", "name": "Default"}, {"uuid": "uuid1", "name": "dmz"}]
+    inventory_module.get_option = MagicMock(
+        side_effect=lambda key, default=None: {
+            "page_concurrency": 4,
+            "hostname_sources": ["hostname", "id"],
+            "hostname_prefix": "",
+            "hostname_suffix": "",
+            "hostname_separator": "",
+        }[key]
+    )
+
+    items = list(inventory_module.fetch_paged_items(paged_api(networks, "networks", 1000), "networks"))
+
+    assert [inventory_module.get_hostname_of_asset(network, "networks") for network in items] == ["Default", "dmz"]
+
+
+def test_agents_named_with_default_hostname_sources(inventory_module):
+    """Agents are named after their name before the default sources, whose integer ids are made strings."""
+    from ansible.inventory.data import InventoryData
+
+    agents = [{"id": 1, "uuid": "uuid1", "name": "agent1", "groups": []}, {"id": 2, "uuid": "uuid2", "groups": []}]
+    options = {
+        **EXPORT_OPTIONS,
+        "hostname_sources": ["hostname", "id", "agent_name", "fqdn"],
+        "page_concurrency": 2,
+        "agent_group_prefix": "agent_group_",
+    }
+    inventory_module.inventory = InventoryData()
+    inventory_module.get_option = lambda key, default=None: options[key]
+
+    items = inventory_module.fetch_paged_items(paged_api(agents, "agents", 5000), "scanners/null/agents")
+    inventory_module.populate_inventory(items, None, False, source="agents")
+
+    assert list(inventory_module.inventory.hosts) == ["agent1", "2"]
+
+
+def test_inventory_stats_nested_phases():
+    """Nested phases are excluded from the phase they run in and streamed items are timed separately."""
+    from ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable import InventoryStats
+
+    def slow_items():
+        for item in range(3):
+            time.sleep(0.02)
+            yield item
+
+    stats = InventoryStats()
+    with stats.phase("populate"):
+        items = list(stats.timed(slow_items(), "fetch"))
+        with stats.phase("templating"):
+            time.sleep(0.02)
+    stats.count("hits")
+    stats.count("hits", 2)
+
+    report = stats.as_dict()
+    assert items == [0, 1, 2]
+    assert report["phases"]["fetch"] >= 0.06
+    assert 0.02 <= report["phases"]["templating"] < 0.06
+    assert report["phases"]["populate"] < 0.02
+    assert report["hits"] == 3
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.init_tenable_api")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.inventory.tenable.InventoryModule.fetch_asset_details")
+def test_parse_writes_stats_file(mock_fetch_asset_details, mock_init_api, inventory_module, tmp_path):
+    """Each parse appends a JSON line with its phases, API cost, cache use and the hosts created."""
+    from ansible.inventory.data import InventoryData
+
+    mock_init_api.return_value = MagicMock(requests_sent=3, retries=1, bytes_received=2048)
+    mock_init_api.return_value.request.return_value = {"status_code": 200, "data": {"assets": mock_assets}}
+    mock_fetch_asset_details.side_effect = lambda api_client, asset_id: {"id": asset_id, "hostname": [asset_id]}
+    stats_file = tmp_path / "stats.jsonl"
+    options = {
+        "access_key": "test_access_key",
+        "secret_key": "test_secret_key",
+        "include_filters": [],
+        "filter_search_type": "",
+        "all_fields": "",
+        "full_info": True,
+        "full_info_concurrency": 2,
+        "source": "assets",
+        "asset_source": "workbench",
+        "asset_details_cache": False,
+        "date_range": 30,
+        "hostname_sources": ["hostname"],
+        "hostname_prefix": "",
+        "hostname_suffix": "",
+        "hostname_separator": "",
+        "hostvars_fields": [],
+        "exclude_fields": [],
+        "tag_groups": [],
+        "field_groups": [],
+        "cache": False,
+        "stats_file": str(stats_file),
+        "groups": {},
+        "compose": {},
+        "keyed_groups": [],
+        "strict": False,
+    }
+    inventory_module._read_config_data = MagicMock()
+    inventory_module.get_option = lambda key, default=None: options[key]
+
+    inventory_module.parse(InventoryData(), MagicMock(), "test_path")
+    # hosts and groups of another source of the inventory are not counted
+    inventory = InventoryData()
+    inventory.add_group("other")
+    inventory.add_host("other_host", group="other")
+    inventory_module.parse(inventory, MagicMock(), "test_path")
+
+    lines = [json.loads(line) for line in stats_file.read_text().splitlines()]
+    assert len(lines) == 2
+    assert set(lines[0]["phases"]) == {
+        "client",
+        "cache_read",
+        "fetch",
+        "populate",
+        "enrichment",
+        "grouping",
+        "templating",
+    }
+    assert lines[0]["hosts"] == lines[1]["hosts"] == 2
+    assert lines[0]["groups"] == lines[1]["groups"] == 0
+    assert lines[0]["requests_sent"] == 3
+    assert lines[0]["bytes_received"] == 2048
+    assert lines[0]["inventory_cache_misses"] == 1
+    assert lines[0]["source"] == "assets"
@@ -1,11 +1,21 @@
+import asyncio
+import io
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
 from unittest.mock import MagicMock
 from unittest.mock import patch
 from urllib.error import HTTPError
 from urllib.error import URLError
 
 import pytest
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import AsyncTenableAPI
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import RetryPolicy
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import TenableAPI
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api import parse_retry_after
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.exceptions import AuthenticationError
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.exceptions import BadRequestError
 from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.exceptions import TenableAPIError
@@ -24,7 +34,7 @@ def test_tenable_api_initialization(module):
     assert api.headers["X-ApiKeys"] == "accessKey=test_access_key;secretKey=test_secret_key"
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
 def test_tenable_api_request(mock_open, module):
     mock_response = MagicMock()
     mock_response.read.return_value = json.dumps({"result": "success"}).encode("utf-8")
@@ -44,7 +54,7 @@ def test_tenable_api_request(mock_open, module):
     assert response == {"status_code": 200, "data": {"result": "success"}}
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
 def test_tenable_api_request_with_data(mock_open, module):
     mock_response = MagicMock()
     mock_response.read.return_value = json.dumps({"result": "success"}).encode("utf-8")
@@ -68,7 +78,7 @@ def test_tenable_api_request_with_data(mock_open, module):
     assert response == {"status_code": 200, "data": {"result": "success"}}
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
 def test_tenable_api_request_http_error(mock_open, module):
     mock_error_fp = MagicMock()
     mock_error_fp.read.return_value = b"Bad Request"
@@ -81,7 +91,7 @@ def test_tenable_api_request_http_error(mock_open, module):
     assert "Bad Request" in str(excinfo.value)
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
 def test_tenable_api_request_auth_error(mock_open, module):
     mock_error_fp = MagicMock()
     mock_error_fp.read.return_value = b"Unauthorized"
@@ -94,7 +104,7 @@ def test_tenable_api_request_auth_error(mock_open, module):
     assert "Authentication failure. Please check your API keys." in str(excinfo.value)
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
 def test_tenable_api_request_unexpected_error(mock_open, module):
     mock_error_fp = MagicMock()
     mock_error_fp.read.return_value = b"Server Error"
@@ -107,8 +117,9 @@ def test_tenable_api_request_unexpected_error(mock_open, module):
     assert "500" in str(excinfo.value)
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
-def test_tenable_api_request_url_error(mock_open, module):
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_url_error(mock_open, mock_sleep, module):
     mock_open.side_effect = URLError("URL Error")
 
     module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
@@ -118,8 +129,9 @@ def test_tenable_api_request_url_error(mock_open, module):
     assert "URL error occurred" in str(excinfo.value)
 
 
-@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.Request.open")
-def test_tenable_api_request_timeout_error(mock_open, module):
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_timeout_error(mock_open, mock_sleep, module):
     mock_open.side_effect = TimeoutError("Request timed out")
 
     module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
@@ -129,5 +141,514 @@ def test_tenable_api_request_timeout_error(mock_open, module):
     assert "Request timed out" in str(excinfo.value)
 
 
+def http_error(code, retry_after=None):
+    mock_error_fp = MagicMock()
+    mock_error_fp.read.return_value = b"error"
+    headers = {"Retry-After": retry_after} if retry_after else {}
+    return HTTPError(url=None, code=code, msg="error", hdrs=headers, fp=mock_error_fp)
+
+
+def ok_response():
+    mock_response = MagicMock()
+    mock_response.read.return_value = json.dumps({"result": "success"}).encode("utf-8")
+    mock_response.getcode.return_value = 200
+    return mock_response
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_retries_rate_limit(mock_open, mock_sleep, module):
+    mock_open.side_effect = [http_error(429, "7"), http_error(503), ok_response()]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    response = api.request("GET", "test_endpoint")
+
+    assert response == {"status_code": 200, "data": {"result": "success"}}
+    assert api.retries == 2
+    assert mock_sleep.call_args_list[0][0][0] == 7.0
+    assert 0 <= mock_sleep.call_args_list[1][0][0] <= 2
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_post_not_retried_on_server_error(mock_open, mock_sleep, module):
+    mock_open.side_effect = [http_error(503), ok_response()]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    with pytest.raises(UnexpectedAPIResponse):
+        api.request("POST", "test_endpoint", data={"key": "value"})
+    assert api.retries == 0
+    mock_sleep.assert_not_called()
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_post_retried_on_rate_limit(mock_open, mock_sleep, module):
+    mock_open.side_effect = [http_error(429), ok_response()]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    api.request("POST", "test_endpoint", data={"key": "value"})
+    assert api.retries == 1
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_retries_exhausted(mock_open, mock_sleep, module):
+    mock_open.side_effect = [http_error(429) for unused in range(3)]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module, retry_policy=RetryPolicy(max_retries=2))
+    with pytest.raises(UnexpectedAPIResponse) as excinfo:
+        api.request("GET", "test_endpoint")
+    assert "429" in str(excinfo.value)
+    assert api.retries == 2
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_takes_rate_limit_token(mock_open, module, tmp_path, monkeypatch):
+    monkeypatch.setenv("TENABLE_RATE_LIMIT_DIR", str(tmp_path))
+    mock_open.return_value = ok_response()
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module, rate_limit=5)
+    with patch.object(api.rate_limiter, "acquire") as mock_acquire:
+        api.request("GET", "test_endpoint")
+    mock_acquire.assert_called_once_with()
+
+
+def test_retry_policy_budget():
+    policy = RetryPolicy(max_retries=5, budget=10)
+    assert policy.get_delay("GET", 0, 0, 429, "5") == 5.0
+    assert policy.get_delay("GET", 1, 5, 429, "6") is None
+    assert policy.get_delay("PATCH", 0, 0, 502) is None
+    assert policy.get_delay("PATCH", 0, 0) is None
+    assert policy.get_delay("GET", 0, 0, 500) is None
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def write_part_meta(path, endpoint, validator):
+    path.write_text(json.dumps({"url": f"https://cloud.tenable.com/{endpoint}", "validator": validator}))
+
+
+class StreamResponse:
+    def __init__(self, body, status=200, fail_after=None, headers=None):
+        self.body = io.BytesIO(body)
+        self.status = status
+        self.fail_after = fail_after
+        self.headers = headers or {}
+
+    def getcode(self):
+        return self.status
+
+    def read(self, amt=None):
+        if self.fail_after is not None and self.body.tell() >= self.fail_after:
+            raise ConnectionResetError("connection reset")
+        return self.body.read(amt)
+
+    def close(self):
+        pass
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download(mock_open, module, tmp_path):
+    mock_open.return_value = StreamResponse(b"0123456789")
+    target = tmp_path / "scan.nessus"
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("scans/1/export/2/download", str(target), chunk_size=4)
+
+    assert target.read_bytes() == b"0123456789"
+    assert not (tmp_path / "scan.nessus.part").exists()
+    assert result["size"] == 10
+    assert result["resumed_from"] == 0
+    assert mock_open.call_args[1]["headers"]["Accept"] == "application/octet-stream"
+    assert "Range" not in mock_open.call_args[1]["headers"]
+    assert api.headers["Accept"] == "application/json"
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_resumes_part_file(mock_open, module, tmp_path):
+    mock_open.return_value = StreamResponse(b"6789", status=206, headers={"Content-Range": "bytes 6-9/10"})
+    target = tmp_path / "report.pdf"
+    (tmp_path / "report.pdf.part").write_bytes(b"012345")
+    write_part_meta(tmp_path / "report.pdf.part.json", "reports/export/1/download", '"abc"')
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("reports/export/1/download", str(target), accept="application/pdf")
+
+    assert mock_open.call_args[1]["headers"]["Range"] == "bytes=6-"
+    assert mock_open.call_args[1]["headers"]["If-Range"] == '"abc"'
+    assert target.read_bytes() == b"0123456789"
+    assert not (tmp_path / "report.pdf.part.json").exists()
+    assert result["resumed_from"] == 6
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_ignores_part_file_of_another_download(mock_open, module, tmp_path):
+    mock_open.return_value = StreamResponse(b"0123456789")
+    target = tmp_path / "report.pdf"
+    (tmp_path / "report.pdf.part").write_bytes(b"other")
+    write_part_meta(tmp_path / "report.pdf.part.json", "reports/export/2/download", '"abc"')
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("reports/export/1/download", str(target))
+
+    assert "Range" not in mock_open.call_args[1]["headers"]
+    assert target.read_bytes() == b"0123456789"
+    assert result["resumed_from"] == 0
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_restarts_on_unexpected_content_range(mock_open, module, tmp_path):
+    mock_open.side_effect = [
+        StreamResponse(b"456789", status=206, headers={"Content-Range": "bytes 4-9/10"}),
+        StreamResponse(b"0123456789", headers={"ETag": '"abc"'}),
+    ]
+    target = tmp_path / "report.pdf"
+    (tmp_path / "report.pdf.part").write_bytes(b"012345")
+    write_part_meta(tmp_path / "report.pdf.part.json", "reports/export/1/download", '"abc"')
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("reports/export/1/download", str(target))
+
+    assert "Range" not in mock_open.call_args_list[1][1]["headers"]
+    assert target.read_bytes() == b"0123456789"
+    assert result["resumed_from"] == 0
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_completes_finished_part_file(mock_open, module, tmp_path):
+    mock_open.side_effect = HTTPError(
+        "url", 416, "Range Not Satisfiable", {"Content-Range": "bytes */10"}, io.BytesIO(b"")
+    )
+    target = tmp_path / "report.pdf"
+    (tmp_path / "report.pdf.part").write_bytes(b"0123456789")
+    write_part_meta(tmp_path / "report.pdf.part.json", "reports/export/1/download", "Wed, 21 Oct 2015 07:28:00 GMT")
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("reports/export/1/download", str(target))
+
+    assert target.read_bytes() == b"0123456789"
+    assert result["resumed_from"] == 10
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_restarts_when_range_is_ignored(mock_open, module, tmp_path):
+    mock_open.return_value = StreamResponse(b"0123456789")
+    target = tmp_path / "report.pdf"
+    (tmp_path / "report.pdf.part").write_bytes(b"stale")
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("reports/export/1/download", str(target))
+
+    assert target.read_bytes() == b"0123456789"
+    assert result["resumed_from"] == 0
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.api.time.sleep")
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_download_resumes_interrupted_transfer(mock_open, mock_sleep, module, tmp_path):
+    mock_open.side_effect = [
+        StreamResponse(b"0123456789", fail_after=4, headers={"ETag": '"abc"'}),
+        StreamResponse(b"456789", status=206, headers={"Content-Range": "bytes 4-9/10"}),
+    ]
+    target = tmp_path / "scan.csv"
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    result = api.download("scans/1/export/2/download", str(target), chunk_size=4)
+
+    assert mock_open.call_args_list[1][1]["headers"]["Range"] == "bytes=4-"
+    assert target.read_bytes() == b"0123456789"
+    assert api.retries == 1
+    assert result["size"] == 10
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_upload_file(mock_open, module, tmp_path):
+    file_path = tmp_path / "targets.txt"
+    file_path.write_bytes(b"192.168.1.1\n")
+    sent = {}
+
+    def fake_open(method, url, headers, data):
+        sent.update(headers=headers, body=data.read(-1))
+        response = MagicMock()
+        response.read.return_value = json.dumps({"fileuploaded": "targets.txt"}).encode("utf-8")
+        response.getcode.return_value = 200
+        return response
+
+    mock_open.side_effect = fake_open
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    response = api.upload_file("file/upload", str(file_path))
+
+    assert response == {"status_code": 200, "data": {"fileuploaded": "targets.txt"}}
+    assert sent["headers"]["Content-Type"].startswith("multipart/form-data; boundary=")
+    assert int(sent["headers"]["Content-Length"]) == len(sent["body"])
+    assert b"192.168.1.1\n" in sent["body"]
+    assert "Content-Type" not in api.headers
+
+
+def test_request_many_keeps_order_and_item_errors(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+
+    def fake_request(method, endpoint, params=None, data=None, headers=None):
+        if endpoint == "assets/2":
+            raise BadRequestError("Bad Request", 400)
+        if endpoint == "assets/4":
+            raise json.JSONDecodeError("Expecting value", "<html>", 0)
+        time.sleep(0.01 * int(endpoint[-1]))
+        return {"status_code": 200, "data": {"id": endpoint[-1], "params": params}}
+
+    specs = [{"endpoint": f"assets/{idx}", "params": {"a": idx}} for idx in range(5)]
+    with patch.object(TenableAPI, "request", side_effect=fake_request) as mock_request:
+        responses = api.request_many(specs, max_workers=3)
+
+    assert mock_request.call_count == 5
+    assert [response.get("data", {}).get("id") for response in responses] == ["0", "1", None, "3", None]
+    assert responses[3]["data"]["params"] == {"a": 3}
+    assert responses[2] == {"status_code": 400, "error": "Bad Request"}
+    assert responses[4] == {"status_code": None, "error": "Expecting value: line 1 column 1 (char 0)"}
+
+
+def test_request_many_bounds_workers(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    slow_api = SlowAPI(delay=0.02)
+
+    with patch.object(TenableAPI, "request", side_effect=slow_api.request):
+        responses = api.request_many([{"endpoint": f"plugins/plugin/{idx}"} for idx in range(8)], max_workers=2)
+
+    assert len(responses) == 8
+    assert slow_api.max_in_flight == 2
+    assert api.request_many([]) == []
+
+
+def test_paginate_offset_style(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    pages = [
+        {"status_code": 200, "data": {"agents": [{"id": 1}, {"id": 2}], "pagination": {"total": 3}}},
+        {"status_code": 200, "data": {"agents": [{"id": 3}], "pagination": {"total": 3}}},
+    ]
+    with patch.object(TenableAPI, "request", side_effect=pages) as mock_request:
+        items = list(api.paginate("scanners/null/agents", params={"limit": "2", "f": "platform:eq:LINUX"}))
+
+    assert [item["id"] for item in items] == [1, 2, 3]
+    assert mock_request.call_count == 2
+    assert mock_request.call_args_list[1][1]["params"] == {"limit": 2, "offset": 2, "f": "platform:eq:LINUX"}
+
+
+def test_paginate_offset_style_stops_on_total(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    pages = [{"status_code": 200, "data": {"agents": [{"id": 1}, {"id": 2}], "pagination": {"total": 2}}}]
+    with patch.object(TenableAPI, "request", side_effect=pages) as mock_request:
+        items = list(api.paginate("scanners/null/agent-groups/12/agents", params={"limit": 2}))
+
+    assert len(items) == 2
+    assert mock_request.call_count == 1
+
+
+def test_paginate_page_style(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    pages = [
+        {"status_code": 200, "data": {"data": {"plugin_details": [{"id": 1}, {"id": 2}]}, "total_count": 5}},
+        {"status_code": 200, "data": {"data": {"plugin_details": [{"id": 3}, {"id": 4}]}, "total_count": 5}},
+        {"status_code": 200, "data": {"data": {"plugin_details": [{"id": 5}]}, "total_count": 5}},
+    ]
+    with patch.object(TenableAPI, "request", side_effect=pages) as mock_request:
+        items = list(api.paginate("plugins/plugin", params={"size": 2}))
+
+    assert [item["id"] for item in items] == [1, 2, 3, 4, 5]
+    assert [call[1]["params"]["page"] for call in mock_request.call_args_list] == [1, 2, 3]
+
+
+def test_paginate_unknown_endpoint(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    with pytest.raises(ValueError):
+        list(api.paginate("scans"))
+
+
+class SlowAPI:
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, endpoint, params=None, data=None, headers=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if endpoint == "missing":
+            raise BadRequestError("Bad Request", 400)
+        return {"status_code": 200, "data": {"endpoint": endpoint}}
+
+
+def test_async_tenable_api_bounds_concurrency():
+    api = SlowAPI()
+
+    async def run():
+        async with AsyncTenableAPI(api=api, max_concurrency=3) as client:
+            return await asyncio.gather(*(client.request("GET", f"assets/{idx}") for idx in range(9)))
+
+    responses = asyncio.run(run())
+    assert [response["data"]["endpoint"] for response in responses] == [f"assets/{idx}" for idx in range(9)]
+    assert api.max_in_flight == 3
+
+
+def test_async_tenable_api_gather_returns_errors_in_place():
+    async def run():
+        async with AsyncTenableAPI(api=SlowAPI(delay=0)) as client:
+            return await client.gather(("GET", "assets/1"), ("GET", "missing"))
+
+    responses = asyncio.run(run())
+    assert responses[0]["data"]["endpoint"] == "assets/1"
+    assert isinstance(responses[1], BadRequestError)
+
+
+def test_async_tenable_api_cancellation_releases_slot():
+    api = SlowAPI(delay=0.2)
+
+    async def run():
+        async with AsyncTenableAPI(api=api, max_concurrency=1) as client:
+            task = asyncio.ensure_future(client.request("GET", "assets/slow"))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return await client.request("GET", "assets/next")
+
+    assert asyncio.run(run())["data"]["endpoint"] == "assets/next"
+
+
+class EchoHeadersHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _echo(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        received = self.rfile.read(length) if length else b""
+        body = json.dumps(
+            {
+                "path": self.path,
+                "accept": self.headers.get("Accept"),
+                "content_type": self.headers.get("Content-Type"),
+                "call": self.headers.get("X-Call"),
+                "body": received.decode("utf-8"),
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _echo
+    do_POST = _echo
+
+    def log_message(self, *args):
+        pass
+
+
+def test_tenable_api_default_headers_are_read_only(module):
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    with pytest.raises(TypeError):
+        api.headers["Accept"] = "application/pdf"
+
+
+def test_tenable_api_shared_by_many_threads(module):
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), EchoHeadersHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module, pool_size=8)
+    api.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    def call(idx):
+        if idx % 3 == 0:
+            return idx, api.request("POST", f"scans/{idx}", data={"idx": idx}, headers={"X-Call": str(idx)})
+        accept = "text/csv" if idx % 3 == 1 else None
+        headers = {"X-Call": str(idx), "Accept": accept} if accept else {"X-Call": str(idx)}
+        return idx, api.request("GET", f"assets/{idx}", headers=headers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(call, range(300)))
+    finally:
+        api.client.clear()
+        httpd.shutdown()
+        httpd.server_close()
+
+    for idx, response in results:
+        echoed = response["data"]
+        assert echoed["call"] == str(idx)
+        if idx % 3 == 0:
+            assert echoed["path"] == f"/scans/{idx}"
+            assert echoed["content_type"] == "application/json"
+            assert json.loads(echoed["body"]) == {"idx": idx}
+        else:
+            assert echoed["path"] == f"/assets/{idx}"
+            assert echoed["content_type"] is None
+            assert echoed["accept"] == ("text/csv" if idx % 3 == 1 else "application/json")
+    assert dict(api.headers) == {
+        "Accept": "application/json",
+        "X-ApiKeys": "accessKey=test_access_key;secretKey=test_secret_key",
+    }
+
+
 if __name__ == "__main__":
     pytest.main()
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_served_from_cache(mock_open, module, tmp_path, monkeypatch):
+    monkeypatch.setenv("TENABLE_CACHE_DIR", str(tmp_path))
+    mock_open.side_effect = [ok_response(), ok_response(), ok_response()]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key", "use_cache": True}
+    api = TenableAPI(module)
+    first = api.request("GET", "filters/scans/agents")
+    second = TenableAPI(module).request("GET", "filters/scans/agents")
+    api.request("GET", "scans")
+
+    assert first == second == {"status_code": 200, "data": {"result": "success"}}
+    assert mock_open.call_count == 2
+    assert mock_open.call_args.kwargs["url"] == "https://cloud.tenable.com/scans"
+
+
+@patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport.ConnectionPool.open")
+def test_tenable_api_request_cache_disabled_by_default(mock_open, module, monkeypatch):
+    monkeypatch.delenv("TENABLE_RESPONSE_CACHE", raising=False)
+    mock_open.side_effect = [ok_response(), ok_response()]
+
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    api = TenableAPI(module)
+    api.request("GET", "filters/scans/agents")
+    api.request("GET", "filters/scans/agents")
+
+    assert api.cache is None
+    assert mock_open.call_count == 2
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import stat
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.exceptions import TenableAPIError
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.rate_limiter import RateLimiter
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.rate_limiter import get_rate_limiter
+
+
+def take_tokens(directory, count, results):
+    limiter = RateLimiter(rate=0.001, burst=5, key="shared_key", directory=directory)
+    results.put(sum(1 for unused in range(count) if limiter._take() == 0))
+
+
+def test_burst_then_wait(tmp_path):
+    limiter = RateLimiter(rate=2, burst=2, key="access_key", directory=str(tmp_path))
+    assert limiter._take() == 0
+    assert limiter._take() == 0
+    assert 0 < limiter._take() <= 0.5
+
+
+def test_acquire_sleeps_until_token(tmp_path):
+    limiter = RateLimiter(rate=4, burst=1, key="access_key", directory=str(tmp_path))
+    with patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.rate_limiter.time.sleep") as sleep:
+        with patch.object(limiter, "_take", side_effect=[0.25, 0]):
+            assert limiter.acquire() == 0.25
+    sleep.assert_called_once_with(0.25)
+
+
+def test_bucket_is_per_api_key(tmp_path):
+    first = RateLimiter(rate=0.001, burst=1, key="first_key", directory=str(tmp_path))
+    second = RateLimiter(rate=0.001, burst=1, key="second_key", directory=str(tmp_path))
+    assert first._take() == 0
+    assert second._take() == 0
+    assert first._take() > 0
+
+
+def test_bucket_is_shared_across_processes(tmp_path):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=take_tokens, args=(str(tmp_path), 5, results)) for unused in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert sum(results.get() for unused in processes) == 5
+
+
+def test_get_rate_limiter(monkeypatch):
+    monkeypatch.delenv("TENABLE_RATE_LIMIT", raising=False)
+    assert get_rate_limiter("key") is None
+    monkeypatch.setenv("TENABLE_RATE_LIMIT", "10")
+    limiter = get_rate_limiter("key")
+    assert limiter.rate == 10
+    assert limiter.burst == 10
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+def test_burst_below_one_token_is_rejected(monkeypatch):
+    """A burst below one token could never be taken, so acquire would wait forever."""
+    monkeypatch.setenv("TENABLE_RATE_LIMIT", "10")
+    monkeypatch.setenv("TENABLE_RATE_LIMIT_BURST", "0")
+    with pytest.raises(ValueError, match="burst"):
+        get_rate_limiter("key")
+    with pytest.raises(ValueError, match="burst"):
+        RateLimiter(rate=10, burst=0.5)
+
+
+def test_unusable_state_file_raises_tenable_error(tmp_path):
+    limiter = RateLimiter(rate=2, key="access_key", directory=str(tmp_path / "missing"))
+    with pytest.raises(TenableAPIError, match="TENABLE_RATE_LIMIT_DIR"):
+        limiter.acquire()
+
+
+def test_state_file_is_not_followed_through_links(tmp_path):
+    limiter = RateLimiter(rate=2, key="access_key", directory=str(tmp_path))
+    limiter._take()
+    target = tmp_path / "target"
+    target.write_bytes(b"")
+    os.replace(limiter.path, str(tmp_path / "moved"))
+    os.symlink(str(target), limiter.path)
+
+    with pytest.raises(TenableAPIError):
+        limiter._take()
+
+
+def test_default_directory_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("TENABLE_RATE_LIMIT_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    limiter = RateLimiter(rate=2, key="access_key")
+    limiter._take()
+
+    directory = os.path.dirname(limiter.path)
+    assert directory == str(tmp_path / f"tenable-{os.getuid()}")
+    assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
@@ -0,0 +1,107 @@
+import multiprocessing
+import os
+import stat
+import tempfile
+from unittest.mock import patch
+
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import ResponseCache
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import get_cache_ttl
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache import get_response_cache
+
+RESPONSE = {"status_code": 200, "data": {"filters": [{"name": "name"}]}}
+
+
+def write_entries(directory, worker, results):
+    cache = ResponseCache(directory=directory)
+    for idx in range(20):
+        cache.set(f"{worker}-{idx}", RESPONSE, 60)
+    results.put(sum(1 for idx in range(20) if cache.get(f"{worker}-{idx}") == RESPONSE))
+
+
+def test_get_cache_ttl():
+    assert get_cache_ttl("filters/workbenches/assets") == 3600
+    assert get_cache_ttl("editor/scan/templates") == 86400
+    assert get_cache_ttl("plugins/families?all=true") == 3600
+    assert get_cache_ttl("scans") is None
+
+
+def test_key_ignores_query_order_and_depends_on_api_key():
+    key = ResponseCache.make_key("access_key", "GET", "https://cloud.tenable.com/plugins/families?all=true&b=1")
+    assert key == ResponseCache.make_key("access_key", "get", "https://cloud.tenable.com/plugins/families?b=1&all=true")
+    assert key != ResponseCache.make_key("other_key", "GET", "https://cloud.tenable.com/plugins/families?all=true&b=1")
+
+
+def test_entry_expires(tmp_path):
+    cache = ResponseCache(directory=str(tmp_path))
+    with patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache.time.time") as now:
+        now.return_value = 1000.0
+        cache.set("key", RESPONSE, 60)
+        now.return_value = 1059.0
+        assert cache.get("key") == RESPONSE
+        now.return_value = 1060.0
+        assert cache.get("key") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    size = len('{"status_code": 200, "data": {"filters": [{"name": "name"}]}}')
+    cache = ResponseCache(directory=str(tmp_path), max_size=size * 2)
+    with patch("ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.response_cache.time.time") as now:
+        now.return_value = 1000.0
+        cache.set("first", RESPONSE, 60)
+        now.return_value = 1001.0
+        cache.set("second", RESPONSE, 60)
+        now.return_value = 1002.0
+        cache.get("first")
+        now.return_value = 1003.0
+        cache.set("third", RESPONSE, 60)
+
+        assert cache.get("first") == RESPONSE
+        assert cache.get("second") is None
+        assert cache.get("third") == RESPONSE
+
+
+def test_cache_is_shared_by_processes(tmp_path):
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=write_entries, args=(str(tmp_path), worker, results)) for worker in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(results.get() for unused in workers) == [20, 20, 20, 20]
+    assert ResponseCache(directory=str(tmp_path)).get("3-19") == RESPONSE
+
+
+def test_get_response_cache_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv("TENABLE_RESPONSE_CACHE", raising=False)
+    assert get_response_cache() is None
+
+    monkeypatch.setenv("TENABLE_RESPONSE_CACHE", "true")
+    monkeypatch.setenv("TENABLE_CACHE_DIR", str(tmp_path))
+    cache = get_response_cache()
+    assert cache.path.startswith(str(tmp_path))
+
+
+def test_unusable_cache_is_a_miss(tmp_path, monkeypatch):
+    monkeypatch.delenv("TENABLE_CACHE_DIR", raising=False)
+    assert get_response_cache(enabled=True, directory=str(tmp_path / "missing")) is None
+
+    cache = ResponseCache(directory=str(tmp_path))
+    cache.set("key", RESPONSE, 60)
+    os.remove(cache.path)
+    assert cache.get("key") is None
+
+    cache.path = str(tmp_path / "missing" / "cache.sqlite")
+    assert cache.get("key") is None
+    cache.set("key", RESPONSE, 60)
+
+
+def test_default_cache_file_is_private(tmp_path, monkeypatch):
+    monkeypatch.delenv("TENABLE_CACHE_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    cache = ResponseCache()
+
+    assert os.path.dirname(cache.path) == str(tmp_path / f"tenable-{os.getuid()}")
+    assert stat.S_IMODE(os.stat(cache.path).st_mode) == 0o600
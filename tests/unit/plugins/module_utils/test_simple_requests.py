@@ -0,0 +1,49 @@
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.simple_requests import build_nested_response
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.simple_requests import run_module
+from ansible_collections.valkiriaaquatica.tenable.tests.unit.constants import BASE_UTILS_PATH
+
+
+@pytest.fixture
+def module():
+    module = MagicMock()
+    module.params = {"access_key": "test_access_key", "secret_key": "test_secret_key"}
+    return module
+
+
+def test_build_nested_response():
+    assert build_nested_response("agents", [1]) == {"agents": [1]}
+    assert build_nested_response("data.plugin_details", [1]) == {"data": {"plugin_details": [1]}}
+
+
+@patch(BASE_UTILS_PATH + "simple_requests.TenableAPI")
+def test_run_module_single_page(mock_api, module):
+    mock_api.return_value.request.return_value = {"status_code": 200, "data": {"agents": []}}
+
+    run_module(module, "scanners/null/agents", method="GET")
+
+    mock_api.return_value.request.assert_called_once_with("GET", "scanners/null/agents", params={})
+    mock_api.return_value.paginate.assert_not_called()
+    module.exit_json.assert_called_once_with(
+        changed=False,
+        api_response={"status_code": 200, "data": {"agents": []}},
+        retries=mock_api.return_value.retries,
+    )
+
+
+@patch(BASE_UTILS_PATH + "simple_requests.TenableAPI")
+def test_run_module_fetch_all(mock_api, module):
+    module.params["fetch_all"] = True
+    mock_api.return_value.paginate.return_value = iter([{"id": 1}, {"id": 2}])
+
+    run_module(module, "plugins/plugin", method="GET", query_params_func=lambda: {"size": "2"})
+
+    mock_api.return_value.paginate.assert_called_once_with("plugins/plugin", params={"size": "2"})
+    module.exit_json.assert_called_once_with(
+        changed=False,
+        api_response={"status_code": 200, "data": {"data": {"plugin_details": [{"id": 1}, {"id": 2}]}}},
+        retries=mock_api.return_value.retries,
+    )
@@ -0,0 +1,140 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport import ConnectionPool
+from ansible_collections.valkiriaaquatica.tenable.plugins.module_utils.transport import MultipartFileEncoder
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        status = 404 if self.path.startswith("/missing") else 200
+        body = json.dumps({"path": self.path, "port": self.client_address[1]}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_connection_is_reused(server):
+    pool = ConnectionPool(pool_size=2, idle_timeout=30)
+    first = json.loads(pool.open("GET", f"{server}/one").read())
+    second = json.loads(pool.open("GET", f"{server}/two?a=1").read())
+
+    assert second["path"] == "/two?a=1"
+    assert first["port"] == second["port"]
+    pool.clear()
+
+
+def test_idle_connection_expires(server):
+    pool = ConnectionPool(pool_size=2, idle_timeout=0)
+    first = json.loads(pool.open("GET", f"{server}/one").read())
+    second = json.loads(pool.open("GET", f"{server}/two").read())
+
+    assert first["port"] != second["port"]
+    pool.clear()
+
+
+def test_pool_size_bounds_idle_connections(server):
+    pool = ConnectionPool(pool_size=1, idle_timeout=30)
+    responses = [pool.open("GET", f"{server}/{idx}") for idx in range(3)]
+    for response in responses:
+        response.read()
+
+    assert sum(len(idle) for idle in pool._idle.values()) == 1
+    pool.clear()
+
+
+def test_error_status_raises_http_error(server):
+    pool = ConnectionPool()
+    with pytest.raises(HTTPError) as excinfo:
+        pool.open("GET", f"{server}/missing")
+    assert excinfo.value.code == 404
+    assert b"/missing" in excinfo.value.read()
+    pool.clear()
+
+
+class UploadHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        received = self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.received.append((self.headers, received))
+        body = json.dumps({"fileuploaded": "targets.txt"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_multipart_encoder_streams_binary_file(tmp_path):
+    content = bytes(range(256)) * 10
+    file_path = tmp_path / "targets.bin"
+    file_path.write_bytes(content)
+
+    with MultipartFileEncoder("Filedata", str(file_path), boundary="XyZ") as body:
+        chunks = []
+        while True:
+            chunk = body.read(100)
+            if not chunk:
+                break
+            assert len(chunk) <= 100
+            chunks.append(chunk)
+        encoded = b"".join(chunks)
+
+        assert len(encoded) == body.content_length
+        assert body.content_type == "multipart/form-data; boundary=XyZ"
+        body.seek(0)
+        assert body.read(-1) == encoded
+
+    assert encoded == (
+        b'--XyZ\r\nContent-Disposition: form-data; name="Filedata"; filename="targets.bin"\r\n'
+        b"Content-Type: application/octet-stream\r\n\r\n" + content + b"\r\n--XyZ--\r\n"
+    )
+
+
+def test_multipart_encoder_upload(tmp_path):
+    file_path = tmp_path / "targets.txt"
+    file_path.write_bytes(b"192.168.1.1\n192.168.1.2\n")
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), UploadHandler)
+    httpd.received = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    pool = ConnectionPool()
+    try:
+        with MultipartFileEncoder("Filedata", str(file_path), "text/plain") as body:
+            headers = {"Content-Type": body.content_type, "Content-Length": str(body.content_length)}
+            response = pool.open("POST", f"http://127.0.0.1:{httpd.server_address[1]}/file/upload", headers, body)
+        assert json.loads(response.read()) == {"fileuploaded": "targets.txt"}
+    finally:
+        pool.clear()
+        httpd.shutdown()
+        httpd.server_close()
+
+    received_headers, received = httpd.received[0]
+    assert "Transfer-Encoding" not in received_headers
+    assert b"192.168.1.1\n192.168.1.2\n" in received
+    assert received.endswith(b"--\r\n")
@@ -4,7 +4,6 @@ from __future__ import print_function
 
 __metaclass__ = type
 
-from unittest.mock import mock_open
 from unittest.mock import patch
 
 import pytest
@@ -28,14 +27,20 @@ def test_download_report(mock_module):
 
     endpoint = "reports/export/123456/download"
 
-    with patch(BASE_MODULE_PATH + "download_report.TenableAPI") as mock_tenable_api, patch(
-        "builtins.open", mock_open()
-    ) as mock_file:
+    with patch(BASE_MODULE_PATH + "download_report.TenableAPI") as mock_tenable_api:
         instance = mock_tenable_api.return_value
-        instance.request.return_value = {"data": b"fake_data"}
+        instance.download.return_value = {
+            "status_code": 200,
+            "path": "/tmp/report.pdf",
+            "size": 9,
+            "resumed_from": 0,
+            "elapsed": 0.5,
+            "bytes_per_second": 18,
+        }
 
         main()
 
-        instance.request.assert_called_once_with("GET", endpoint)
-        mock_file.assert_called_once_with("/tmp/report.pdf", "wb")
-        mock_file().write.assert_called_once_with(b"fake_data")
+        instance.download.assert_called_once_with(endpoint, "/tmp/report.pdf", accept="application/pdf")
+        mock_module.return_value.exit_json.assert_called_once()
+        assert mock_module.return_value.exit_json.call_args[1]["size"] == 9
+        assert mock_module.return_value.exit_json.call_args[1]["bytes_per_second"] == 18